@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+Story Box - Benchmark Suite
+Generates synthetic USB story libraries on tmpfs and times the StoryBox
+scan/state/display paths against stored baselines.
+Runs anywhere: GPIO, LCD and mixer are replaced with lightweight stand-ins.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from pathlib import Path
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'benchmark_baseline.json')
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+LAYOUTS = ['flat', 'deep']
+TRACKS_PER_STORY = 3
+DISPLAY_CALLS = 1000
+
+# Time-stretch DSP: seconds of 48 kHz stereo audio per speed, and the
+# share of one core it may use regardless of baseline
+DSP_SPEEDS = [0.8, 1.25]
+DSP_SECONDS = 20
+DSP_CORE_BUDGET = 0.25
+
+# Allowed slowdown over baseline before a case fails
+DEFAULT_TOLERANCE = {
+    'wall_ms': 0.25,
+    'fs_calls': 0.05,
+    'syscalls': 0.10,
+    'rw_syscalls': 0.10,
+    'alloc_peak_kb': 0.25,
+    'core_share': 0.25,
+}
+# Differences below these are treated as noise
+ABSOLUTE_SLACK = {
+    'wall_ms': 0.5,
+    'fs_calls': 2,
+    'syscalls': 5,
+    'rw_syscalls': 5,
+    'alloc_peak_kb': 16,
+    'core_share': 0.01,
+}
+
+# Mixed-case extensions, as found on real sticks
+EXTENSIONS = ['.mp3', '.MP3', '.wav', '.WAV', '.ogg', '.OGG',
+              '.flac', '.FLAC', '.m4a', '.M4A', '.Mp3']
+
+
+# ---------------------------------------------------------------------------
+# Hardware stand-ins
+# ---------------------------------------------------------------------------
+
+def install_stand_ins():
+    """Register fake pygame, RPi.GPIO and RPLCD modules"""
+    # GPIO: every button reads as released
+    gpio = types.ModuleType('RPi.GPIO')
+    gpio.BCM = 11
+    gpio.IN = 1
+    gpio.OUT = 0
+    gpio.PUD_UP = 22
+    gpio.LOW = 0
+    gpio.HIGH = 1
+    gpio.setmode = lambda mode: None
+    gpio.setwarnings = lambda flag: None
+    gpio.setup = lambda pin, mode, pull_up_down=None: None
+    gpio.input = lambda pin: 1
+    gpio.output = lambda pin, value: None
+    gpio.cleanup = lambda: None
+    rpi = types.ModuleType('RPi')
+    rpi.GPIO = gpio
+
+    # LCD: accepts writes and discards them
+    class CharLCD:
+        def __init__(self, *args, **kwargs):
+            self.cursor_pos = (0, 0)
+
+        def clear(self):
+            pass
+
+        def write_string(self, text):
+            pass
+
+    rplcd = types.ModuleType('RPLCD')
+    rplcd_i2c = types.ModuleType('RPLCD.i2c')
+    rplcd_i2c.CharLCD = CharLCD
+    rplcd.i2c = rplcd_i2c
+
+    # Mixer: never busy, never makes a sound
+    class Sound:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def play(self, *args, **kwargs):
+            pass
+
+        def set_volume(self, volume):
+            pass
+
+    class Channel:
+        def __init__(self, channel_id):
+            pass
+
+        def play(self, sound):
+            pass
+
+        def queue(self, sound):
+            pass
+
+        def get_busy(self):
+            return False
+
+        def get_queue(self):
+            return None
+
+        def pause(self):
+            pass
+
+        def unpause(self):
+            pass
+
+        def stop(self):
+            pass
+
+        def set_volume(self, volume):
+            pass
+
+    music = types.SimpleNamespace(
+        load=lambda *args, **kwargs: None,
+        play=lambda *args, **kwargs: None,
+        stop=lambda: None,
+        pause=lambda: None,
+        unpause=lambda: None,
+        set_volume=lambda volume: None,
+        get_busy=lambda: False,
+        get_pos=lambda: 0,
+    )
+    mixer = types.SimpleNamespace(
+        init=lambda *args, **kwargs: None,
+        quit=lambda: None,
+        set_reserved=lambda count: None,
+        Sound=Sound,
+        Channel=Channel,
+        music=music,
+    )
+    pygame = types.ModuleType('pygame')
+    pygame.mixer = mixer
+
+    sys.modules['pygame'] = pygame
+    sys.modules['RPi'] = rpi
+    sys.modules['RPi.GPIO'] = gpio
+    sys.modules['RPLCD'] = rplcd
+    sys.modules['RPLCD.i2c'] = rplcd_i2c
+
+
+# ---------------------------------------------------------------------------
+# Synthetic libraries
+# ---------------------------------------------------------------------------
+
+def tmpfs_root():
+    """Pick a RAM-backed directory so disk speed does not skew results"""
+    for candidate in ('/dev/shm', '/run/user/%d' % os.getuid()):
+        if os.path.isdir(candidate) and os.access(candidate, os.W_OK):
+            return candidate
+    return None
+
+
+def build_library(root, layout, count):
+    """Create `count` story folders under root/<mount>/ and return them"""
+    root = Path(root)
+    stories = []
+
+    if layout == 'flat':
+        # One stick, every story at the top level
+        mounts = [root / 'STORYBOX']
+    else:
+        # Several sticks, stories padded with nested non-story folders
+        mounts = [root / f'STICK{n}' for n in range(4)]
+
+    for mount in mounts:
+        mount.mkdir(parents=True)
+
+    for i in range(count):
+        mount = mounts[i % len(mounts)]
+        story = mount / f'{i:05d}_Story_{i}'
+        story.mkdir()
+        for t in range(TRACKS_PER_STORY):
+            ext = EXTENSIONS[(i + t) % len(EXTENSIONS)]
+            (story / f'{t + 1:02d}_Chapter_{t + 1}{ext}').write_bytes(b'\0' * 64)
+        (story / 'cover.jpg').write_bytes(b'\0' * 64)
+
+        if layout == 'deep':
+            nested = story / 'extras' / 'artwork' / 'large'
+            nested.mkdir(parents=True)
+            (nested / 'cover.png').write_bytes(b'\0' * 64)
+            (story / 'extras' / 'notes.txt').write_bytes(b'\0' * 16)
+
+        stories.append(story)
+
+    if layout == 'deep':
+        # Folders with no audio still have to be looked at and rejected
+        for mount in mounts:
+            for n in range(max(1, count // 10)):
+                (mount / f'zz_Empty_{n}' / 'sub').mkdir(parents=True)
+
+    return stories
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+class FsCallCounter:
+    """Count filesystem calls made through the os module"""
+
+    WRAPPED = ['stat', 'lstat', 'scandir', 'listdir', 'open', 'replace',
+               'rename', 'fsync']
+
+    def __init__(self):
+        self.calls = 0
+        self._originals = {}
+
+    def __enter__(self):
+        for name in self.WRAPPED:
+            original = getattr(os, name, None)
+            if original is None:
+                continue
+            self._originals[name] = original
+            setattr(os, name, self._wrap(original))
+        self._builtin_open = io.open
+        import builtins
+        builtins.open = self._wrap(self._builtin_open)
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self._originals.items():
+            setattr(os, name, original)
+        import builtins
+        builtins.open = self._builtin_open
+        return False
+
+    def _wrap(self, fn):
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return fn(*args, **kwargs)
+        return counted
+
+
+def allow_ptrace():
+    """Let strace (our child) attach to us when Yama ptrace_scope is 1"""
+    try:
+        import ctypes
+        PR_SET_PTRACER = 0x59616d61
+        PR_SET_PTRACER_ANY = ctypes.c_ulong(-1)
+        ctypes.CDLL(None).prctl(PR_SET_PTRACER, PR_SET_PTRACER_ANY, 0, 0, 0)
+    except Exception:
+        pass
+
+
+class SyscallCounter:
+    """Count every syscall this process makes inside the with block
+
+    Attaches `strace -f -c` to the benchmark process, so the getdents,
+    stat and openat calls that scanning makes are counted along with
+    reads and writes. `calls` stays None when strace is not installed or
+    cannot attach (e.g. no ptrace permission in a container).
+    """
+
+    ATTACH_SETTLE = 0.2     # Seconds for strace to reach the other threads
+
+    def __init__(self):
+        self.calls = None
+        self.proc = None
+        self.output = None
+
+    def __enter__(self):
+        strace = shutil.which('strace')
+        if not strace:
+            return self
+        allow_ptrace()
+        fd, self.output = tempfile.mkstemp(prefix='storybox-strace-')
+        os.close(fd)
+        self.proc = subprocess.Popen(
+            [strace, '-f', '-c', '-o', self.output, '-p', str(os.getpid())],
+            stderr=subprocess.PIPE, text=True
+        )
+        if 'attached' not in self.proc.stderr.readline():
+            self.proc.wait()
+            self.proc = None
+        else:
+            time.sleep(self.ATTACH_SETTLE)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if self.proc:
+                self.proc.send_signal(signal.SIGINT)
+                self.proc.wait()
+                self.calls = self.read_total(self.output)
+        finally:
+            if self.output:
+                os.unlink(self.output)
+        return False
+
+    @staticmethod
+    def read_total(path):
+        """Calls column of the 'total' row of an strace -c summary"""
+        with open(path, 'r') as f:
+            for line in f:
+                fields = line.split()
+                if fields and fields[-1] == 'total':
+                    return int(fields[3])
+        return None
+
+
+def read_syscall_counters():
+    """Read and write syscall counts for this process (Linux only)"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['syscr']) + int(fields['syscw'])
+    except Exception:
+        return None
+
+
+def measure(fn, repeat):
+    """Run fn repeatedly and collect wall time, syscalls and allocations"""
+    # Warm-up run also fills the dentry cache, like a stick that is in use
+    fn()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Instrumented runs are separate so the wrappers do not skew timing
+    before = read_syscall_counters()
+    with FsCallCounter() as counter:
+        fn()
+    after = read_syscall_counters()
+
+    with SyscallCounter() as syscalls:
+        fn()
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        'wall_ms': round(statistics.median(timings), 3),
+        'fs_calls': counter.calls,
+        'alloc_peak_kb': round(peak / 1024, 1),
+    }
+    if syscalls.calls is not None:
+        result['syscalls'] = syscalls.calls
+    if before is not None and after is not None:
+        result['rw_syscalls'] = after - before
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+def make_story_box(usb_root, state_file):
+    """Build a StoryBox wired to the synthetic tree, threads stopped"""
+    import storybox
+
+    class BenchStoryBox(storybox.StoryBox):
+        USB_MOUNT_BASE = str(usb_root)
+        STATE_FILE = str(state_file)
+        SOUNDS_DIR = str(Path(usb_root).parent / 'sounds')
+        CHAPTER_CACHE_DIR = str(Path(usb_root).parent / 'chapters')
+        METRICS_FILE = str(Path(usb_root).parent / 'metrics.json')
+        LIBRARY_DIR = str(Path(usb_root).parent / 'library')
+        VALIDATION_CACHE = str(Path(usb_root).parent / 'validation.json')
+        WATCHDOG_LOG = str(Path(usb_root).parent / 'watchdog.log')
+
+        def mount_usb(self):
+            pass
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        box = BenchStoryBox()
+    box.stop_event.set()
+    box.scheduler.shutdown()
+    box.watchdog.stop()
+    box.monitor_thread.join()
+    box.button_thread.join()
+    return box
+
+
+def run_cases(sizes, layouts, repeat, workdir):
+    results = {}
+
+    for layout in layouts:
+        for count in sizes:
+            case_root = Path(tempfile.mkdtemp(prefix=f'{layout}-{count}-',
+                                              dir=workdir))
+            try:
+                usb_root = case_root / 'media'
+                stories = build_library(usb_root, layout, count)
+                box = make_story_box(usb_root, case_root / 'state.json')
+
+                # Last story is the worst case for anything that searches
+                target = stories[-1]
+                box.current_folder = target
+                box.playlist = sorted(f for f in target.iterdir()
+                                      if f.suffix.lower() != '.jpg' and f.is_file())
+                box.current_track_index = 1
+
+                def quiet(fn):
+                    def run():
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            fn()
+                    return run
+
+                def display_loop():
+                    for i in range(DISPLAY_CALLS):
+                        box.update_display(target.name, f'Track {i}')
+
+                cases = {
+                    'scan_all_folders': quiet(box.scan_all_folders),
+                    'save_state': quiet(box.save_state),
+                    'load_state': quiet(box.load_state),
+                    'update_display': quiet(display_loop),
+                }
+
+                # save_state first so load_state has something to restore
+                quiet(box.save_state)()
+
+                for name, fn in cases.items():
+                    key = f'{name}/{layout}/{count}'
+                    results[key] = measure(fn, repeat)
+                    print(f"  {key:<32} {results[key]['wall_ms']:>10.3f} ms")
+
+                found = len(box.available_folders)
+                if found != count:
+                    print(f"✗ scan_all_folders found {found}/{count} stories")
+            finally:
+                shutil.rmtree(case_root, ignore_errors=True)
+
+    return results
+
+
+def run_dsp_cases(speeds, seconds):
+    """Time-stretch synthetic audio block by block, as StretchedPlayer does"""
+    import storybox
+    
+    if storybox.np is None:
+        print("⚠ numpy not installed, skipping time-stretch cases")
+        return {}, []
+    np = storybox.np
+    
+    # Voice-like test signal: a few harmonics with a wandering pitch, plus noise
+    rate = storybox.StretchedPlayer.SAMPLE_RATE
+    t = np.arange(rate * seconds) / rate
+    pitch = 180 + 40 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    signal = sum(np.sin(phase * h) / h for h in range(1, 6))
+    signal += 0.05 * np.random.default_rng(1).standard_normal(len(t))
+    samples = (signal / np.abs(signal).max() * 12000).astype(np.int16)
+    pcm = np.stack((samples, samples), axis=1).tobytes()
+    
+    block = int(rate * storybox.StretchedPlayer.BLOCK_SECONDS) * 4
+    results = {}
+    over_budget = []
+    
+    for speed in speeds:
+        stretcher = storybox.TimeStretcher(speed)
+        start = time.thread_time()
+        produced = 0
+        for i in range(0, len(pcm), block):
+            produced += len(stretcher.process(pcm[i:i + block]))
+        produced += len(stretcher.flush())
+        cpu = time.thread_time() - start
+        
+        key = f'time_stretch/{speed:g}x'
+        results[key] = {
+            'core_share': round(cpu / seconds, 4),
+            'output_ratio': round(produced / len(pcm), 3),
+        }
+        print(f"  {key:<32} {results[key]['core_share'] * 100:>9.2f} % of a core")
+        
+        if results[key]['core_share'] > DSP_CORE_BUDGET:
+            over_budget.append(
+                f"{key} core_share: {results[key]['core_share']} > budget {DSP_CORE_BUDGET}")
+    
+    return results, over_budget
+
+
+# ---------------------------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------------------------
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    baseline = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': sys.version.split()[0],
+        'machine': os.uname().machine,
+        'cases': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    print(f"✓ Baseline saved to {path}")
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of human readable regressions"""
+    regressions = []
+    stored = baseline.get('cases', {})
+
+    for key, metrics in sorted(results.items()):
+        if key not in stored:
+            print(f"⚠ No baseline for {key}")
+            continue
+        for metric, value in metrics.items():
+            reference = stored[key].get(metric)
+            if reference is None or metric not in tolerance:
+                continue
+            limit = reference * (1 + tolerance[metric]) + ABSOLUTE_SLACK[metric]
+            if value > limit:
+                regressions.append(
+                    f"{key} {metric}: {value} > {limit:.3f} (baseline {reference})")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Story Box benchmark suite')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='number of story folders per library')
+    parser.add_argument('--layouts', nargs='+', choices=LAYOUTS, default=LAYOUTS)
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='timed runs per case (median is reported)')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help='override allowed wall time slowdown (0.25 = 25%%)')
+    parser.add_argument('--output', help='also write results as JSON here')
+    parser.add_argument('--skip-dsp', action='store_true',
+                        help='skip the time-stretch cases')
+    args = parser.parse_args()
+
+    install_stand_ins()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    workdir = tmpfs_root()
+    if workdir is None:
+        print("⚠ No tmpfs found, using default temp dir (results will be noisier)")
+
+    print("=" * 60)
+    print("STORY BOX BENCHMARK")
+    print("=" * 60)
+    results = run_cases(args.sizes, args.layouts, args.repeat, workdir)
+    
+    over_budget = []
+    if not args.skip_dsp:
+        dsp_results, over_budget = run_dsp_cases(DSP_SPEEDS, DSP_SECONDS)
+        results.update(dsp_results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        return 0
+
+    tolerance = dict(DEFAULT_TOLERANCE)
+    if args.tolerance is not None:
+        tolerance['wall_ms'] = args.tolerance
+
+    regressions = list(over_budget)
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"⚠ No baseline at {args.baseline} (run with --save-baseline)")
+    else:
+        regressions += compare(results, baseline, tolerance)
+    if regressions:
+        print(f"\n✗ {len(regressions)} regression(s):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+
+    print("\n✓ All cases within thresholds")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
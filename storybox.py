@@ -2,18 +2,1914 @@
 """
 Story Box - Children's Audio Player
 Hardware: Raspberry Pi Zero 2 W + I2S Audio Bonnet + I2C LCD + 5 Buttons
-Features: Multi-story selection, Audio feedback, Auto-play, Safe shutdown
+Features: Multi-story selection, Audio feedback, Auto-play, Safe shutdown,
+          Chapter navigation in single-file audiobooks, Playback speed
 """
 
 import os
 import time
 import pygame
 import json
+import errno
+import hashlib
+import heapq
+import itertools
+import queue
+import shutil
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import traceback
+from collections import deque
 from pathlib import Path
-from threading import Thread, Event
+from threading import Thread, Event, Condition, Lock, RLock
 import RPi.GPIO as GPIO
 from RPLCD.i2c import CharLCD
 
+try:
+    import numpy as np
+except ImportError:
+    np = None   # Variable speed playback is disabled without numpy
+
+# MPEG audio header tables: bitrates in kbps, indexed by [bitrate bits]
+MP3_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],   # MPEG 1
+    2: [22050, 24000, 16000],   # MPEG 2
+    0: [11025, 12000, 8000],    # MPEG 2.5
+}
+
+
+def parse_mp3_frame_header(header):
+    """Return (frame_length, samples, sample_rate) or None if not a frame"""
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    
+    version = (header[1] >> 3) & 0x03
+    layer = 4 - ((header[1] >> 1) & 0x03)
+    bitrate_index = (header[2] >> 4) & 0x0F
+    rate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+    
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    
+    mpeg1 = version == 3
+    bitrate = MP3_BITRATES[(1 if mpeg1 else 2, layer)][bitrate_index] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+    
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    if layer == 3 and not mpeg1:
+        return 72 * bitrate // sample_rate + padding, 576, sample_rate
+    return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+
+
+def id3v2_tag_size(data):
+    """Size of the ID3v2 tag at the start of data (0 if there is none)"""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def decode_id3_text(data):
+    """Decode an ID3 text frame body (encoding byte + text)"""
+    if not data:
+        return ''
+    encoding, text = data[0], data[1:]
+    codec = {0: 'latin-1', 1: 'utf-16', 2: 'utf-16-be', 3: 'utf-8'}.get(encoding, 'latin-1')
+    return text.decode(codec, errors='replace').rstrip('\x00').strip()
+
+
+class SeekableSlice:
+    """Read-only file that starts at a byte offset of another file
+    
+    Handed to pygame so an MP3 can be started from a frame boundary
+    without the decoder reading (or even seeing) the bytes before it.
+    """
+    
+    def __init__(self, path, offset):
+        self._file = open(path, 'rb')
+        self._offset = offset
+        self._file.seek(offset)
+    
+    def read(self, size=-1):
+        return self._file.read(size)
+    
+    def seek(self, pos, whence=0):
+        if whence == 0:
+            pos += self._offset
+        self._file.seek(pos, whence)
+        return self.tell()
+    
+    def tell(self):
+        return self._file.tell() - self._offset
+    
+    def close(self):
+        self._file.close()
+
+
+class FileWindow:
+    """Bytes-like random access to a file through a sliding read buffer
+    
+    Stands in for mmap in the frame scanners: a page fault on a mapped
+    file from a pulled or failing USB stick kills the process with
+    SIGBUS, while read() raises OSError. Supports len(), indexing,
+    slicing and find(). Reads can be paced to rate_limit bytes per
+    second so whole-file scans leave the stick to playback.
+    """
+    
+    WINDOW = 256 * 1024
+    
+    def __init__(self, f, rate_limit=None):
+        self.f = f
+        self.size = os.fstat(f.fileno()).st_size
+        self.rate_limit = rate_limit
+        self.start = 0
+        self.buffer = b''
+    
+    def __len__(self):
+        return self.size
+    
+    def read(self, pos, length):
+        self.f.seek(pos)
+        data = self.f.read(length)
+        if self.rate_limit:
+            time.sleep(len(data) / self.rate_limit)
+        return data
+    
+    def window(self, start, stop):
+        """Bytes start:stop, from the buffer or a fresh read"""
+        stop = min(stop, self.size)
+        if start >= stop:
+            return b''
+        if start < self.start or stop > self.start + len(self.buffer):
+            if stop - start > self.WINDOW:
+                return self.read(start, stop - start)
+            self.buffer = self.read(start, self.WINDOW)
+            self.start = start
+        return self.buffer[start - self.start:stop - self.start]
+    
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, _ = key.indices(self.size)
+            return self.window(start, stop)
+        if key < 0:
+            key += self.size
+        data = self.window(key, key + 1)
+        if not data:
+            raise IndexError('FileWindow index out of range')
+        return data[0]
+    
+    def find(self, sub, start=0, end=None):
+        end = self.size if end is None else min(end, self.size)
+        pos = start
+        while pos < end:
+            stop = min(end, pos + self.WINDOW)
+            found = self.window(pos, stop).find(sub)
+            if found >= 0:
+                return pos + found
+            if stop >= end:
+                return -1
+            pos = stop - (len(sub) - 1)
+        return -1
+
+
+class ChapterIndex:
+    """Chapter markers and seek tables for long single-file audiobooks
+    
+    Chapters come from a cue sheet next to the file, ID3 CHAP frames or
+    MP4 (Nero) chapter atoms. MP3 files also get a seek table holding
+    the byte offset of every Nth frame. MPEG frames have a fixed
+    duration, even in VBR files, so a time maps straight to a table slot.
+    Results are cached on disk keyed by file size and mtime.
+    """
+    
+    FRAMES_PER_ENTRY = 40   # ~1s per seek table slot at 44.1/48 kHz
+    RATE_LIMIT = 2 * 1024 * 1024    # Bytes per second read while indexing
+    
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.entries = {}
+        self.building = set()
+    
+    def cache_path(self, track):
+        name = hashlib.sha1(str(track).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, name + '.json')
+    
+    def file_key(self, track):
+        stat = os.stat(track)
+        return [stat.st_size, int(stat.st_mtime)]
+    
+    def get(self, track):
+        """Return cached index for track, reading chapter markers if needed"""
+        track = Path(track)
+        key = self.file_key(track)
+        
+        entry = self.entries.get(str(track))
+        if entry and entry['key'] == key:
+            return entry
+        
+        try:
+            with open(self.cache_path(track), 'r') as f:
+                entry = json.load(f)
+            if entry.get('key') != key:
+                entry = None
+        except Exception:
+            entry = None
+        
+        if entry is None:
+            entry = {
+                'key': key,
+                'chapters': self.read_chapters(track),
+                'seek_table': None,
+                'entry_duration': None,
+            }
+            self.save(track, entry)
+        
+        self.entries[str(track)] = entry
+        return entry
+    
+    def save(self, track, entry):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.cache_path(track), 'w') as f:
+                json.dump(entry, f)
+        except Exception as e:
+            print(f"✗ Failed to save chapter index: {e}")
+    
+    def build_seek_table(self, track):
+        """Scan MP3 frames once and persist the offset table"""
+        track = Path(track)
+        if track.suffix.lower() != '.mp3' or str(track) in self.building:
+            return
+        
+        entry = self.get(track)
+        if entry['seek_table'] is not None:
+            return
+        
+        self.building.add(str(track))
+        task = TaskScheduler.current_task()
+        try:
+            offsets = []
+            entry_duration = None
+            frame_count = 0
+            
+            with open(track, 'rb') as f:
+                data = FileWindow(f, self.RATE_LIMIT)
+                pos = id3v2_tag_size(data[:10])
+                end = len(data)
+                if end >= 128 and data[end - 128:end - 125] == b'TAG':
+                    end -= 128
+                
+                while pos + 4 <= end:
+                    header = parse_mp3_frame_header(data[pos:pos + 4])
+                    if header is None:
+                        # Lost sync, look for the next frame
+                        pos = data.find(b'\xff', pos + 1, end)
+                        if pos < 0:
+                            break
+                        continue
+                    
+                    if task and task.cancelled and frame_count % 4096 == 0:
+                        print(f"⚠ Indexing cancelled: {track.name}")
+                        return
+                    
+                    length, samples, sample_rate = header
+                    if entry_duration is None:
+                        entry_duration = self.FRAMES_PER_ENTRY * samples / sample_rate
+                    if frame_count % self.FRAMES_PER_ENTRY == 0:
+                        offsets.append(pos)
+                    frame_count += 1
+                    pos += length
+            
+            if offsets:
+                entry['seek_table'] = offsets
+                entry['entry_duration'] = entry_duration
+                self.save(track, entry)
+                print(f"✓ Seek index: {track.name} ({len(offsets)} entries)")
+        except Exception as e:
+            print(f"✗ Failed to index {track.name}: {e}")
+        finally:
+            self.building.discard(str(track))
+    
+    def resolve(self, track, seconds):
+        """Return (start_seconds, byte_offset) of the frame at or before seconds
+        
+        Returns None when the file has no seek table yet.
+        """
+        entry = self.entries.get(str(track))
+        if not entry or not entry['seek_table']:
+            return None
+        
+        table = entry['seek_table']
+        slot = min(int(seconds / entry['entry_duration']), len(table) - 1)
+        return slot * entry['entry_duration'], table[slot]
+    
+    # Chapter marker readers
+    
+    def read_chapters(self, track):
+        """Read chapters as a sorted list of {'title', 'start'} dicts"""
+        for reader in (self.read_cue_chapters,
+                       self.read_id3_chapters,
+                       self.read_mp4_chapters):
+            try:
+                chapters = reader(track)
+            except Exception as e:
+                print(f"✗ Chapter read failed for {track.name}: {e}")
+                chapters = []
+            if len(chapters) > 1:
+                return sorted(chapters, key=lambda c: c['start'])
+        return []
+    
+    def read_cue_chapters(self, track):
+        """Chapters from <track>.cue, or any cue sheet naming this file"""
+        candidates = [track.with_suffix('.cue'), track.with_suffix('.CUE')]
+        candidates += [c for c in track.parent.iterdir()
+                       if c.suffix.lower() == '.cue' and c not in candidates]
+        
+        for cue in candidates:
+            if not cue.is_file():
+                continue
+            with open(cue, 'r', encoding='utf-8', errors='replace') as f:
+                lines = [line.strip() for line in f]
+            
+            chapters = []
+            current_file = None
+            title = None
+            for line in lines:
+                upper = line.upper()
+                if upper.startswith('FILE '):
+                    current_file = line[5:].rsplit(' ', 1)[0].strip().strip('"')
+                elif upper.startswith('TRACK '):
+                    title = None
+                elif upper.startswith('TITLE ') and current_file is not None:
+                    title = line[6:].strip().strip('"')
+                elif upper.startswith('INDEX 01 ') and current_file is not None:
+                    if Path(current_file).name != track.name:
+                        continue
+                    minutes, secs, frames = line[9:].strip().split(':')
+                    start = int(minutes) * 60 + int(secs) + int(frames) / 75
+                    chapters.append({
+                        'title': title or f"Chapter {len(chapters) + 1}",
+                        'start': start,
+                    })
+            if chapters:
+                return chapters
+        return []
+    
+    def read_id3_chapters(self, track):
+        """Chapters from ID3v2.3/2.4 CHAP frames"""
+        with open(track, 'rb') as f:
+            header = f.read(10)
+            size = id3v2_tag_size(header)
+            if not size:
+                return []
+            tag = f.read(size - 10)
+        
+        major = header[3]
+        chapters = []
+        pos = 0
+        while pos + 10 <= len(tag):
+            frame_id = tag[pos:pos + 4]
+            if frame_id == b'\0\0\0\0':
+                break
+            if major >= 4:
+                frame_size = (tag[pos + 4] << 21) | (tag[pos + 5] << 14) | \
+                             (tag[pos + 6] << 7) | tag[pos + 7]
+            else:
+                frame_size = struct.unpack('>I', tag[pos + 4:pos + 8])[0]
+            body = tag[pos + 10:pos + 10 + frame_size]
+            pos += 10 + frame_size
+            
+            if frame_id != b'CHAP':
+                continue
+            
+            element_end = body.index(b'\0')
+            start_ms = struct.unpack('>I', body[element_end + 1:element_end + 5])[0]
+            title = None
+            
+            # Embedded sub-frames carry the chapter title
+            sub = body[element_end + 17:]
+            sub_pos = 0
+            while sub_pos + 10 <= len(sub):
+                sub_id = sub[sub_pos:sub_pos + 4]
+                if major >= 4:
+                    sub_size = (sub[sub_pos + 4] << 21) | (sub[sub_pos + 5] << 14) | \
+                               (sub[sub_pos + 6] << 7) | sub[sub_pos + 7]
+                else:
+                    sub_size = struct.unpack('>I', sub[sub_pos + 4:sub_pos + 8])[0]
+                if sub_id == b'TIT2':
+                    title = decode_id3_text(sub[sub_pos + 10:sub_pos + 10 + sub_size])
+                sub_pos += 10 + sub_size
+            
+            chapters.append({
+                'title': title or f"Chapter {len(chapters) + 1}",
+                'start': start_ms / 1000,
+            })
+        return chapters
+    
+    def read_mp4_chapters(self, track):
+        """Chapters from the Nero 'chpl' atom in moov/udta"""
+        if track.suffix.lower() not in ('.m4a', '.m4b', '.mp4'):
+            return []
+        
+        with open(track, 'rb') as f:
+            def find_atom(name, end):
+                while f.tell() + 8 <= end:
+                    start = f.tell()
+                    size, kind = struct.unpack('>I4s', f.read(8))
+                    if size == 1:
+                        size = struct.unpack('>Q', f.read(8))[0]
+                    elif size == 0:
+                        size = end - start
+                    if kind == name:
+                        return start + size
+                    f.seek(start + size)
+                return None
+            
+            end = os.fstat(f.fileno()).st_size
+            for name in (b'moov', b'udta', b'chpl'):
+                end = find_atom(name, end)
+                if end is None:
+                    return []
+            
+            version = f.read(4)[0]
+            if version:
+                f.read(4)
+            count = f.read(1)[0]
+            chapters = []
+            for _ in range(count):
+                start = struct.unpack('>Q', f.read(8))[0] / 10_000_000
+                title = f.read(f.read(1)[0]).decode('utf-8', errors='replace')
+                chapters.append({
+                    'title': title or f"Chapter {len(chapters) + 1}",
+                    'start': start,
+                })
+            return chapters
+
+
+class TimeStretcher:
+    """Pitch-preserving time-stretch (WSOLA) for 16-bit stereo PCM blocks
+    
+    Each output frame is an input window taken near its nominal position,
+    nudged by up to TOLERANCE samples to line up with the natural
+    continuation of the previous window, then overlap-added. The
+    alignment search runs on a decimated mono mix so it stays cheap
+    enough for a Pi Zero 2 W.
+    """
+    
+    WINDOW = 1024       # 21 ms at 48 kHz
+    TOLERANCE = 256     # Max alignment shift either side (samples)
+    DECIMATE = 4        # Search resolution (samples)
+    
+    def __init__(self, speed, channels=2):
+        self.speed = speed
+        self.channels = channels
+        self.hop_out = self.WINDOW // 2
+        self.hop_in = self.hop_out * speed
+        # Periodic Hann windows sum to 1 at 50% overlap
+        self.window = np.hanning(self.WINDOW + 1)[:-1].astype(np.float32)[:, None]
+        self.reset()
+    
+    def reset(self):
+        self.buffer = np.zeros((0, self.channels), dtype=np.float32)
+        self.buffer_start = 0           # Input sample index of buffer[0]
+        self.position = float(self.TOLERANCE)
+        self.previous = None            # Input index of the last window used
+        self.tail = np.zeros((self.WINDOW - self.hop_out, self.channels),
+                             dtype=np.float32)
+    
+    def find_alignment(self, nominal):
+        """Input index near nominal that best continues the previous window"""
+        lo = max(nominal - self.TOLERANCE, self.buffer_start)
+        if self.previous is None:
+            return lo
+        
+        start = self.previous + self.hop_out - self.buffer_start
+        template = self.buffer[start:start + self.WINDOW:self.DECIMATE].mean(axis=1)
+        
+        region_start = lo - self.buffer_start
+        region_end = nominal + self.TOLERANCE + self.WINDOW - self.buffer_start
+        region = self.buffer[region_start:region_end:self.DECIMATE].mean(axis=1)
+        
+        # Normalised cross-correlation over every candidate shift at once
+        corr = np.correlate(region, template, mode='valid')
+        energy = np.cumsum(np.concatenate(([0.0], region * region)))
+        energy = energy[len(template):] - energy[:-len(template)]
+        score = corr / np.sqrt(np.maximum(energy[:len(corr)], 1e-9))
+        
+        return lo + int(np.argmax(score)) * self.DECIMATE
+    
+    def process(self, pcm):
+        """Stretch interleaved int16 bytes, returning int16 bytes
+        
+        Output lags input by roughly one window; call flush() at the end.
+        """
+        block = np.frombuffer(pcm, dtype=np.int16).reshape(-1, self.channels)
+        self.buffer = np.concatenate((self.buffer, block.astype(np.float32)))
+        buffer_end = self.buffer_start + len(self.buffer)
+        
+        frames = []
+        while True:
+            nominal = int(self.position)
+            needed = nominal + self.TOLERANCE + self.WINDOW
+            if self.previous is not None:
+                needed = max(needed, self.previous + self.hop_out + self.WINDOW)
+            if needed > buffer_end:
+                break
+            
+            best = self.find_alignment(nominal)
+            start = best - self.buffer_start
+            frame = self.buffer[start:start + self.WINDOW] * self.window
+            
+            frames.append(self.tail + frame[:self.hop_out])
+            self.tail = frame[self.hop_out:]
+            self.previous = best
+            self.position += self.hop_in
+        
+        # Drop input nothing will look at again
+        keep_from = min(int(self.position) - self.TOLERANCE,
+                        self.previous if self.previous is not None else self.buffer_start)
+        drop = max(0, keep_from - self.buffer_start)
+        if drop:
+            self.buffer = self.buffer[drop:]
+            self.buffer_start += drop
+        
+        if not frames:
+            return b''
+        out = np.concatenate(frames)
+        return np.clip(out, -32768, 32767).astype(np.int16).tobytes()
+    
+    def flush(self):
+        """Return the overlap tail left after the last block"""
+        out = np.clip(self.tail, -32768, 32767).astype(np.int16).tobytes()
+        self.reset()
+        return out
+
+
+class StretchedPlayer:
+    """Variable-speed playback streamed into a reserved mixer channel
+    
+    ffmpeg decodes the track to 48 kHz stereo PCM, TimeStretcher changes
+    its speed, and the result is double-buffered into the channel: one
+    block playing, the next one queued. Offers the same calls StoryBox
+    makes on pygame.mixer.music so the two can be swapped.
+    """
+    
+    SAMPLE_RATE = 48000
+    CHANNELS = 2
+    BLOCK_SECONDS = 0.5
+    
+    def __init__(self, channel_id=0):
+        self.channel = pygame.mixer.Channel(channel_id)
+        self.speed = 1.0
+        self.volume = 1.0
+        self.track = None
+        self.thread = None
+        self.process = None
+        self.stop_event = Event()
+        self.start_position = 0.0
+        self.paused_at = None
+        self.underruns = 0
+        
+        # Output frames the channel has actually played, for get_pos
+        self.lock = Lock()
+        self.played_frames = 0
+        self.current_frames = 0
+        self.current_started = None
+        self.queued_frames = 0
+    
+    @staticmethod
+    def available():
+        """True when numpy and ffmpeg are both installed"""
+        return np is not None and shutil.which('ffmpeg') is not None
+    
+    def set_speed(self, speed):
+        self.speed = speed
+    
+    def load(self, track, namehint=None):
+        self.stop()
+        self.track = str(track)
+    
+    def play(self, loops=0, start=0.0):
+        self.stop()
+        self.stop_event.clear()
+        self.start_position = start
+        self.paused_at = None
+        with self.lock:
+            self.played_frames = 0
+            self.current_frames = 0
+            self.current_started = None
+            self.queued_frames = 0
+        self.process = subprocess.Popen(
+            ['ffmpeg', '-v', 'error', '-nostdin', '-ss', f'{start:.3f}',
+             '-i', self.track, '-f', 's16le', '-ac', str(self.CHANNELS),
+             '-ar', str(self.SAMPLE_RATE), '-'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        self.thread = Thread(target=self.stream, args=(self.process,), daemon=True)
+        self.thread.start()
+    
+    def stream(self, process):
+        """Decode, stretch and feed the channel until the track ends"""
+        stretcher = TimeStretcher(self.speed, self.CHANNELS)
+        block_bytes = int(self.SAMPLE_RATE * self.BLOCK_SECONDS) * self.CHANNELS * 2
+        
+        first = True
+        
+        try:
+            while not self.stop_event.is_set():
+                pcm = process.stdout.read(block_bytes)
+                out = stretcher.process(pcm) if pcm else stretcher.flush()
+                if out:
+                    frames = len(out) // (self.CHANNELS * 2)
+                    self.enqueue(pygame.mixer.Sound(buffer=out), frames, first)
+                    first = False
+                if not pcm:
+                    break
+            
+            # Let the last blocks drain
+            while not self.stop_event.is_set() and self.channel.get_busy():
+                self.stop_event.wait(0.1)
+        except Exception as e:
+            print(f"✗ Speed playback failed: {e}")
+        finally:
+            process.stdout.close()
+            process.kill()
+            process.wait()
+    
+    def enqueue(self, sound, frames, first):
+        """Play sound now, or queue it behind the playing block"""
+        while not self.stop_event.is_set():
+            if not self.channel.get_busy():
+                if not first:
+                    # Channel ran dry before the next block was ready
+                    self.underruns += 1
+                self.channel.play(sound)
+                self.channel.set_volume(self.volume)
+                with self.lock:
+                    self.played_frames += self.current_frames + self.queued_frames
+                    self.current_frames = frames
+                    self.current_started = time.monotonic()
+                    self.queued_frames = 0
+                return
+            if self.channel.get_queue() is None:
+                self.channel.queue(sound)
+                with self.lock:
+                    if self.queued_frames:
+                        # The block queued last time has started playing
+                        self.played_frames += self.current_frames
+                        self.current_frames = self.queued_frames
+                        self.current_started = time.monotonic()
+                    self.queued_frames = frames
+                return
+            self.stop_event.wait(0.02)
+    
+    def pause(self):
+        if self.paused_at is None:
+            self.paused_at = time.monotonic()
+            self.channel.pause()
+    
+    def unpause(self):
+        if self.paused_at is not None:
+            with self.lock:
+                if self.current_started is not None:
+                    self.current_started += time.monotonic() - self.paused_at
+            self.paused_at = None
+            self.channel.unpause()
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.process:
+            self.process.kill()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.channel.stop()
+        self.thread = None
+        self.process = None
+    
+    def get_busy(self):
+        if self.paused_at is not None:
+            return True
+        return bool(self.thread and self.thread.is_alive())
+    
+    def get_pos(self):
+        """Milliseconds of source audio played since play()
+        
+        Counts blocks the channel has taken, plus time into the current
+        block up to its length, so the position stops moving when the
+        mixer does (the watchdog's stall check relies on this).
+        """
+        with self.lock:
+            if self.current_started is None:
+                return 0 if self.thread else -1
+            now = self.paused_at or time.monotonic()
+            into_block = min(max(0.0, now - self.current_started) * self.SAMPLE_RATE,
+                             self.current_frames)
+            frames = self.played_frames + into_block
+        return int(frames / self.SAMPLE_RATE * self.speed * 1000)
+    
+    def set_volume(self, volume):
+        self.volume = volume
+        self.channel.set_volume(volume)
+
+
+class TrackValidator:
+    """Checks audio files are intact before the decoder reaches them
+    
+    Files are structure-checked (MP3 frames, WAV chunks, Ogg pages, FLAC
+    metadata, MP4 atoms) rather than decoded, reading at a limited rate so
+    playback from the same stick stays smooth. Results are cached on disk
+    keyed by size and mtime, so a file is only checked again once it
+    changes.
+    """
+    
+    MAX_JUNK = 0.05     # Fraction of an MP3 that may fail to parse as frames
+    RATE_LIMIT = 2 * 1024 * 1024    # Bytes per second read while checking
+    
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.lock = Lock()
+        try:
+            with open(cache_file, 'r') as f:
+                self.results = json.load(f)
+        except Exception:
+            self.results = {}
+        
+        self.session_bad = {}
+        self.checked = 0
+        self.failed = 0
+    
+    def file_key(self, track):
+        stat = os.stat(track)
+        return [stat.st_size, int(stat.st_mtime)]
+    
+    def cached(self, track):
+        """Cached result for track, or None if unknown or out of date"""
+        result = self.results.get(str(track))
+        if not result:
+            return None
+        try:
+            if result['key'] != self.file_key(track):
+                return None
+        except OSError:
+            return None
+        return result
+    
+    def is_bad(self, track):
+        if str(track) in self.session_bad:
+            return True
+        result = self.cached(track)
+        return bool(result and not result['ok'])
+    
+    def bad_tracks(self, folder):
+        """Tracks in folder last recorded as bad (no disk access)"""
+        folder = str(folder)
+        with self.lock:
+            bad = {path for path, result in self.results.items() if not result['ok']}
+            bad.update(self.session_bad)
+            return sorted(Path(path) for path in bad if os.path.dirname(path) == folder)
+    
+    def record(self, track, ok, reason=''):
+        try:
+            key = self.file_key(track)
+        except OSError:
+            key = None
+        with self.lock:
+            self.results[str(track)] = {'key': key, 'ok': ok, 'reason': reason}
+        if not ok:
+            self.failed += 1
+            print(f"⚠ Bad track: {Path(track).name} ({reason})")
+    
+    def mark_bad(self, track, reason):
+        """Skip a track the decoder could not play, until the next restart
+        
+        Playback can fail for reasons that pass (a USB read error), so the
+        failure is only saved once confirm_bad finds the file broken.
+        """
+        with self.lock:
+            self.session_bad[str(track)] = reason
+        print(f"⚠ Bad track: {Path(track).name} ({reason})")
+    
+    def confirm_bad(self, track):
+        """Structure-check a track the decoder rejected (runs as a background task)"""
+        try:
+            reason = self.check(Path(track))
+        except OSError as e:
+            print(f"⚠ Could not re-check {Path(track).name}: {e}")
+            return
+        except Exception as e:
+            reason = str(e)
+        self.checked += 1
+        if reason:
+            self.record(track, False, reason)
+            self.save()
+    
+    def save(self):
+        try:
+            with self.lock:
+                data = dict(self.results)
+            tmp_file = self.cache_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print(f"✗ Failed to save validation cache: {e}")
+    
+    def validate_tracks(self, tracks, health=None):
+        """Check each track not already cached (runs as a background task)"""
+        task = TaskScheduler.current_task()
+        changed = False
+        
+        for track in tracks:
+            if task and task.cancelled:
+                break
+            if self.cached(track):
+                continue
+            while health and not health.has_headroom():
+                if task and task.cancelled:
+                    break
+                time.sleep(1.0)
+            
+            try:
+                reason = self.check(Path(track))
+            except Exception as e:
+                reason = str(e)
+            self.record(track, not reason, reason or '')
+            self.checked += 1
+            changed = True
+        
+        if changed:
+            self.save()
+    
+    def check(self, track):
+        """Return a reason the file is broken, or None if it looks intact"""
+        if os.path.getsize(track) == 0:
+            return 'empty file'
+        
+        checker = {
+            '.mp3': self.check_mp3,
+            '.wav': self.check_wav,
+            '.ogg': self.check_ogg,
+            '.flac': self.check_flac,
+            '.m4a': self.check_mp4,
+            '.m4b': self.check_mp4,
+        }.get(track.suffix.lower())
+        if checker is None:
+            return None
+        
+        with open(track, 'rb') as f:
+            return checker(FileWindow(f, self.RATE_LIMIT))
+    
+    def check_mp3(self, data):
+        pos = id3v2_tag_size(data[:10])
+        end = len(data)
+        if pos > end:
+            return 'truncated ID3 tag'
+        if end >= 128 and data[end - 128:end - 125] == b'TAG':
+            end -= 128
+        
+        frames = 0
+        junk = 0
+        while pos + 4 <= end:
+            header = parse_mp3_frame_header(data[pos:pos + 4])
+            if header is None:
+                next_pos = data.find(b'\xff', pos + 1, end)
+                junk += (next_pos if next_pos >= 0 else end) - pos
+                if next_pos < 0:
+                    break
+                pos = next_pos
+                continue
+            
+            length = header[0]
+            if pos + length > end:
+                # A short last frame (cut-off download) still decodes;
+                # the decoder just drops it
+                break
+            frames += 1
+            pos += length
+        
+        if frames == 0:
+            return 'no MPEG audio frames'
+        if junk > self.MAX_JUNK * end:
+            return 'corrupt frames'
+        return None
+    
+    def check_wav(self, data):
+        if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+            return 'not a WAV file'
+        pos = 12
+        found_fmt = False
+        while pos + 8 <= len(data):
+            chunk_id = data[pos:pos + 4]
+            size = struct.unpack('<I', data[pos + 4:pos + 8])[0]
+            if chunk_id == b'fmt ':
+                found_fmt = True
+            elif chunk_id == b'data':
+                if not found_fmt:
+                    return 'missing fmt chunk'
+                if size != 0xFFFFFFFF and pos + 8 + size > len(data):
+                    return 'truncated data'
+                return None
+            pos += 8 + size + (size & 1)
+        return 'missing data chunk'
+    
+    def check_ogg(self, data):
+        pos = 0
+        last_flags = None
+        while pos < len(data):
+            if data[pos:pos + 4] != b'OggS':
+                return 'corrupt page' if pos else 'not an Ogg file'
+            if pos + 27 > len(data):
+                return 'truncated page'
+            segments = data[pos + 26]
+            if pos + 27 + segments > len(data):
+                return 'truncated page'
+            body = sum(data[pos + 27:pos + 27 + segments])
+            last_flags = data[pos + 5]
+            pos += 27 + segments + body
+        if pos > len(data):
+            return 'truncated page'
+        if not last_flags & 0x04:
+            return 'missing end of stream'
+        return None
+    
+    def check_flac(self, data):
+        pos = id3v2_tag_size(data[:10])
+        if data[pos:pos + 4] != b'fLaC':
+            return 'not a FLAC file'
+        pos += 4
+        while True:
+            if pos + 4 > len(data):
+                return 'truncated metadata'
+            header = data[pos]
+            size = int.from_bytes(data[pos + 1:pos + 4], 'big')
+            pos += 4 + size
+            if header & 0x80:
+                break
+        if pos + 2 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xFE) != 0xF8:
+            return 'missing audio frames'
+        return None
+    
+    def check_mp4(self, data):
+        pos = 0
+        atoms = set()
+        while pos + 8 <= len(data):
+            size, kind = struct.unpack('>I4s', data[pos:pos + 8])
+            if size == 1:
+                size = struct.unpack('>Q', data[pos + 8:pos + 16])[0]
+            elif size == 0:
+                size = len(data) - pos
+            if size < 8:
+                return 'corrupt atom'
+            if pos + size > len(data):
+                return 'truncated atom'
+            atoms.add(kind)
+            pos += size
+        if b'moov' not in atoms or b'mdat' not in atoms:
+            return 'missing moov/mdat'
+        return None
+    
+    def stats(self):
+        return {'checked': self.checked, 'failed': self.failed,
+                'cached': len(self.results), 'session_bad': len(self.session_bad)}
+
+
+class SystemHealth:
+    """Audio buffer fill and CPU headroom, read from /proc
+    
+    Background work backs off when the ALSA playback buffer runs low
+    (the decoder is falling behind) or the CPUs are nearly saturated.
+    Shared by every worker: /proc is read at most once per interval and
+    other callers get the cached values, so the CPU idle figure always
+    covers a full interval.
+    """
+    
+    AUDIO_BUFFER_MIN = 0.25     # Fraction of the ALSA buffer that must be queued
+    CPU_IDLE_MIN = 0.20         # Fraction of total CPU time that must be idle
+    SAMPLE_INTERVAL = 1.0       # Seconds between /proc reads
+    
+    def __init__(self, audio_card):
+        self.pcm_dir = f'/proc/asound/card{audio_card}/pcm0p/sub0'
+        self.lock = Lock()
+        self.last_cpu = None
+        self.last_sample = None
+        self.cpu_idle = 1.0
+        self.audio_buffer = None
+    
+    def read_audio_buffer(self):
+        """Fraction of the playback buffer filled, or None when not playing"""
+        try:
+            with open(os.path.join(self.pcm_dir, 'status'), 'r') as f:
+                status = dict(line.split(':', 1) for line in f if ':' in line)
+            if status.get('state', '').strip() == 'XRUN':
+                return 0.0
+            if status.get('state', '').strip() != 'RUNNING':
+                return None
+            
+            with open(os.path.join(self.pcm_dir, 'hw_params'), 'r') as f:
+                params = dict(line.split(':', 1) for line in f if ':' in line)
+            return int(status['delay']) / int(params['buffer_size'])
+        except Exception:
+            return None
+    
+    def read_cpu_idle(self):
+        """Fraction of CPU time idle since the previous call"""
+        try:
+            with open('/proc/stat', 'r') as f:
+                fields = [int(v) for v in f.readline().split()[1:]]
+        except Exception:
+            return self.cpu_idle
+        
+        idle, total = fields[3] + fields[4], sum(fields)
+        if self.last_cpu is not None:
+            d_total = total - self.last_cpu[1]
+            if d_total > 0:
+                self.cpu_idle = (idle - self.last_cpu[0]) / d_total
+        self.last_cpu = (idle, total)
+        return self.cpu_idle
+    
+    def sample(self):
+        """Refresh the readings if the last sample is older than the interval"""
+        with self.lock:
+            now = time.monotonic()
+            if self.last_sample is not None and now - self.last_sample < self.SAMPLE_INTERVAL:
+                return
+            self.last_sample = now
+            self.audio_buffer = self.read_audio_buffer()
+            self.read_cpu_idle()
+    
+    def has_headroom(self):
+        """True when it is safe to run background work"""
+        self.sample()
+        if self.audio_buffer is not None and self.audio_buffer < self.AUDIO_BUFFER_MIN:
+            return False
+        return self.cpu_idle >= self.CPU_IDLE_MIN
+
+
+def latency_percentiles(samples):
+    """p50/p95/max in milliseconds of a list of durations in seconds"""
+    if not samples:
+        return {'p50': None, 'p95': None, 'max': None}
+    ordered = sorted(samples)
+    return {
+        'p50': round(ordered[len(ordered) // 2] * 1000, 1),
+        'p95': round(ordered[int(len(ordered) * 0.95)] * 1000, 1),
+        'max': round(ordered[-1] * 1000, 1),
+    }
+
+
+class Task:
+    """A unit of background work queued on the TaskScheduler"""
+    
+    def __init__(self, fn, args, priority, name):
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.name = name or getattr(fn, '__name__', 'task')
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+        self.cancelled = False
+    
+    def cancel(self):
+        """Drop the task if queued; running tasks should check `cancelled`"""
+        self.cancelled = True
+
+
+class TaskScheduler:
+    """Bounded pool of low-priority worker threads for background work
+    
+    Workers run at a raised nice level, pinned away from the cores the
+    mixer and button threads use, and pause normal and idle work while
+    SystemHealth reports the audio buffer or CPU headroom is low.
+    Reserved workers only take high priority work, so state flushes still
+    run while every other worker is stuck reading a hung USB stick.
+    """
+    
+    PRIORITY_HIGH = 0       # Short, latency-sensitive (state flushes)
+    PRIORITY_NORMAL = 1     # Scans, indexing
+    PRIORITY_IDLE = 2       # Only when nothing else is waiting
+    
+    BACKOFF_MIN = 0.5
+    BACKOFF_MAX = 8.0
+    LATENCY_SAMPLES = 200
+    
+    _local = threading.local()
+    
+    def __init__(self, workers=2, nice=10, cpus=None, health=None, reserved=0):
+        self.nice = nice
+        self.cpus = cpus
+        self.health = health
+        
+        self.queue = []
+        self.counter = itertools.count()
+        self.condition = Condition()
+        self.stopping = False
+        
+        self.running = 0
+        self.active = set()
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.backoffs = 0
+        self.wait_times = deque(maxlen=self.LATENCY_SAMPLES)
+        self.run_times = deque(maxlen=self.LATENCY_SAMPLES)
+        
+        self.workers = []
+        for i in range(workers + reserved):
+            worker = Thread(target=self.worker_loop, args=(i >= workers,),
+                            name=f'storybox-worker-{i}', daemon=True)
+            worker.start()
+            self.workers.append(worker)
+    
+    @classmethod
+    def current_task(cls):
+        """The Task running on this thread, or None"""
+        return getattr(cls._local, 'task', None)
+    
+    def submit(self, fn, *args, priority=PRIORITY_NORMAL, name=None):
+        """Queue fn(*args) and return its Task"""
+        task = Task(fn, args, priority, name)
+        with self.condition:
+            if self.stopping:
+                task.cancel()
+                return task
+            heapq.heappush(self.queue, (priority, next(self.counter), task))
+            # Wake everyone: a reserved worker may not take this task
+            self.condition.notify_all()
+        return task
+    
+    def shutdown(self):
+        """Cancel queued and running work and stop the workers"""
+        with self.condition:
+            self.stopping = True
+            for task in self.active:
+                task.cancel()
+            for _, _, task in self.queue:
+                task.cancel()
+            self.cancelled += len(self.queue)
+            self.queue = []
+            self.condition.notify_all()
+    
+    def configure_worker(self):
+        """Lower this thread's priority and move it off the audio cores"""
+        tid = threading.get_native_id()
+        try:
+            os.setpriority(os.PRIO_PROCESS, tid, self.nice)
+        except Exception as e:
+            print(f"⚠ Worker nice failed: {e}")
+        
+        if self.cpus and hasattr(os, 'sched_setaffinity'):
+            try:
+                os.sched_setaffinity(tid, self.cpus)
+            except Exception as e:
+                print(f"⚠ Worker affinity failed: {e}")
+    
+    def worker_loop(self, high_only=False):
+        self.configure_worker()
+        backoff = self.BACKOFF_MIN
+        
+        while True:
+            with self.condition:
+                while not self.stopping and not (
+                        self.queue and (not high_only or
+                                        self.queue[0][0] == self.PRIORITY_HIGH)):
+                    self.condition.wait()
+                if self.stopping:
+                    return
+                _, _, task = self.queue[0]
+                
+                if task.cancelled:
+                    heapq.heappop(self.queue)
+                    self.cancelled += 1
+                    continue
+                
+                # Only high priority work runs while playback is struggling
+                if (task.priority > self.PRIORITY_HIGH and self.health and
+                        not self.health.has_headroom()):
+                    self.backoffs += 1
+                    self.condition.wait(backoff)
+                    backoff = min(backoff * 2, self.BACKOFF_MAX)
+                    continue
+                
+                backoff = self.BACKOFF_MIN
+                heapq.heappop(self.queue)
+                self.running += 1
+                self.active.add(task)
+            
+            self.run_task(task)
+    
+    def run_task(self, task):
+        task.started = time.monotonic()
+        self._local.task = task
+        failed = False
+        try:
+            task.fn(*task.args)
+        except Exception as e:
+            failed = True
+            print(f"✗ Background task {task.name} failed: {e}")
+        finally:
+            self._local.task = None
+            task.finished = time.monotonic()
+        
+        with self.condition:
+            self.running -= 1
+            self.active.discard(task)
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+            self.wait_times.append(task.started - task.submitted)
+            self.run_times.append(task.finished - task.started)
+    
+    def stats(self):
+        """Queue depth, counters and latency percentiles (ms)"""
+        with self.condition:
+            return {
+                'queue_depth': len(self.queue),
+                'running': self.running,
+                'completed': self.completed,
+                'failed': self.failed,
+                'cancelled': self.cancelled,
+                'backoffs': self.backoffs,
+                'wait_ms': latency_percentiles(self.wait_times),
+                'run_ms': latency_percentiles(self.run_times),
+                'audio_buffer': self.health.audio_buffer if self.health else None,
+                'cpu_idle': round(self.health.cpu_idle, 2) if self.health else None,
+            }
+
+
+class StoryImporter:
+    """Copies story folders from USB into the library on the SD card
+    
+    Files are copied in chunks at a limited rate. Every chunk is fsynced,
+    dropped from the page cache and read back to check its SHA-256, and
+    the journal of verified chunks is saved before the next one, so an
+    import interrupted by a power cut resumes where it stopped. Finished
+    files with the same content are hard-linked to a single copy.
+    """
+    
+    CHUNK_SIZE = 1024 * 1024
+    RATE_LIMIT = 2 * 1024 * 1024    # Bytes per second read from USB
+    COPY_EXTENSIONS = ('.mp3', '.wav', '.ogg', '.flac', '.m4a', '.m4b', '.cue')
+    
+    def __init__(self, library_dir, health=None):
+        self.library_dir = Path(library_dir)
+        self.journal_dir = self.library_dir / '.import'
+        self.health = health
+        self.lock = Lock()
+        self.queued = set()
+        
+        self.stories_imported = 0
+        self.files_copied = 0
+        self.files_deduplicated = 0
+        self.bytes_copied = 0
+        self.failures = 0
+    
+    # Journals
+    
+    def journal_path(self, name):
+        return self.journal_dir / f'{name}.json'
+    
+    def load_journal(self, name):
+        try:
+            with open(self.journal_path(name), 'r') as f:
+                return json.load(f)
+        except Exception:
+            return None
+    
+    def write_json(self, path, data):
+        """Write JSON so a power cut leaves the old or the new file, never half"""
+        tmp_path = str(path) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
+    def is_complete(self, name):
+        journal = self.load_journal(name)
+        return bool(journal and journal.get('complete') and
+                    (self.library_dir / name).is_dir())
+    
+    def local_copy(self, folder):
+        """Library copy of a USB story folder, if fully imported from it"""
+        local = self.library_dir / Path(folder).name
+        if Path(folder) == local:
+            return local
+        journal = self.load_journal(local.name)
+        # Same name, different stick: not a copy of this folder
+        if self.is_complete(local.name) and journal.get('source') == str(folder):
+            return local
+        return None
+    
+    def local_stories(self):
+        """All fully imported story folders"""
+        if not self.library_dir.is_dir():
+            return []
+        return sorted(f for f in self.library_dir.iterdir()
+                      if f.is_dir() and not f.name.startswith('.')
+                      and self.is_complete(f.name))
+    
+    def in_library(self, folder):
+        return self.library_dir in Path(folder).parents
+    
+    def source_of(self, folder):
+        """USB folder a library story was imported from, or None"""
+        journal = self.load_journal(Path(folder).name)
+        if journal and journal.get('source'):
+            return Path(journal['source'])
+        return None
+    
+    # Import
+    
+    def import_story(self, folder):
+        """Copy one story folder into the library (runs as a background task)"""
+        folder = Path(folder)
+        name = folder.name
+        dest_dir = self.library_dir / name
+        task = TaskScheduler.current_task()
+        
+        try:
+            sources = sorted(f for f in folder.iterdir()
+                             if f.is_file() and f.suffix.lower() in self.COPY_EXTENSIONS)
+            signature = {f.name: [f.stat().st_size, int(f.stat().st_mtime)]
+                         for f in sources}
+            
+            journal = self.load_journal(name)
+            if journal and journal.get('complete') and \
+                    journal.get('signature') == signature and dest_dir.is_dir():
+                return
+            
+            if not journal or journal.get('source') != str(folder):
+                journal = {'source': str(folder), 'files': {}}
+            
+            # Anything that changed on the stick starts again from scratch
+            for file_name, entry in list(journal['files'].items()):
+                if journal.get('signature', {}).get(file_name) != signature.get(file_name):
+                    del journal['files'][file_name]
+            journal['signature'] = signature
+            journal['complete'] = False
+            
+            self.journal_dir.mkdir(parents=True, exist_ok=True)
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            self.write_json(self.journal_path(name), journal)
+            print(f"→ Importing: {name}")
+            
+            for src in sources:
+                entry = journal['files'].setdefault(src.name, {'chunks': [], 'sha256': None})
+                if entry['sha256'] and (dest_dir / src.name).exists():
+                    continue
+                if not self.copy_file(src, dest_dir / src.name, entry, journal, task):
+                    print(f"⚠ Import paused: {name}")
+                    return
+            
+            # Tracks removed or renamed on the stick go from the copy too
+            for path in dest_dir.iterdir():
+                file_name = path.name[:-5] if path.name.endswith('.part') else path.name
+                if path.is_file() and file_name not in signature:
+                    path.unlink()
+            
+            journal['complete'] = True
+            self.write_json(self.journal_path(name), journal)
+            self.stories_imported += 1
+            print(f"✓ Imported: {name}")
+        except Exception as e:
+            self.failures += 1
+            print(f"✗ Import failed for {name}: {e}")
+        finally:
+            self.queued.discard(name)
+    
+    def copy_file(self, src, dest, entry, journal, task):
+        """Copy src to dest chunk by chunk; False if cancelled"""
+        part = dest.with_name(dest.name + '.part')
+        journal_path = self.journal_path(dest.parent.name)
+        chunks = entry['chunks']
+        digest = hashlib.sha256()
+        
+        # Resume after the last chunk that is still on disk and intact
+        part.touch(exist_ok=True)
+        del chunks[self.verify_part(part, chunks, digest):]
+        
+        started = time.monotonic()
+        sent = 0
+        
+        with open(src, 'rb') as source, open(part, 'r+b') as target:
+            offset = len(chunks) * self.CHUNK_SIZE
+            source.seek(offset)
+            target.truncate(offset)
+            target.seek(offset)
+            
+            while True:
+                if task and task.cancelled:
+                    self.write_json(journal_path, journal)
+                    return False
+                if self.wait_for_headroom(task):
+                    # Start the rate average afresh, or the paused time
+                    # would be made up with a burst at full USB speed
+                    started = time.monotonic()
+                    sent = 0
+                
+                data = source.read(self.CHUNK_SIZE)
+                if not data:
+                    break
+                chunk_hash = hashlib.sha256(data).hexdigest()
+                
+                target.write(data)
+                target.flush()
+                os.fsync(target.fileno())
+                if not self.read_back_ok(target, offset, len(data), chunk_hash):
+                    raise IOError(f"checksum mismatch in {src.name} at {offset}")
+                
+                offset += len(data)
+                chunks.append(chunk_hash)
+                digest.update(data)
+                self.write_json(journal_path, journal)
+                self.bytes_copied += len(data)
+                
+                # Rate limit USB reads so playback from the stick stays smooth
+                sent += len(data)
+                ahead = sent / self.RATE_LIMIT - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+        
+        os.replace(part, dest)
+        entry['sha256'] = digest.hexdigest()
+        self.files_copied += 1
+        self.deduplicate(dest, entry['sha256'])
+        self.write_json(journal_path, journal)
+        return True
+    
+    def verify_part(self, part, chunks, digest):
+        """Count leading chunks of part that match their recorded hashes"""
+        verified = 0
+        with open(part, 'rb') as f:
+            for chunk_hash in chunks:
+                data = f.read(self.CHUNK_SIZE)
+                if hashlib.sha256(data).hexdigest() != chunk_hash:
+                    break
+                digest.update(data)
+                verified += 1
+        return verified
+    
+    def read_back_ok(self, target, offset, length, chunk_hash):
+        """Re-read a written chunk from the card, not the page cache"""
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(target.fileno(), offset, length, os.POSIX_FADV_DONTNEED)
+        target.seek(offset)
+        ok = hashlib.sha256(target.read(length)).hexdigest() == chunk_hash
+        target.seek(offset + length)
+        return ok
+    
+    def wait_for_headroom(self, task):
+        """Sleep until there is headroom; True if it had to wait"""
+        waited = False
+        while self.health and not self.health.has_headroom():
+            if task and task.cancelled:
+                break
+            waited = True
+            time.sleep(1.0)
+        return waited
+    
+    def deduplicate(self, dest, sha256):
+        """Hard-link dest to an existing library file with the same content
+        
+        objects.json maps each hash to a path and the inode and size it had
+        when hashed. A re-imported file is a new inode, so an entry whose
+        path has since been rewritten is never linked to.
+        """
+        objects_path = self.journal_dir / 'objects.json'
+        with self.lock:
+            try:
+                with open(objects_path, 'r') as f:
+                    objects = json.load(f)
+            except Exception:
+                objects = {}
+            
+            existing = objects.get(sha256)
+            if isinstance(existing, dict) and existing['path'] != str(dest):
+                try:
+                    st = os.stat(existing['path'])
+                    unchanged = (st.st_ino, st.st_size) == (existing['ino'], existing['size'])
+                except OSError:
+                    unchanged = False
+                if unchanged:
+                    link = dest.with_name(dest.name + '.link')
+                    os.link(existing['path'], link)
+                    os.replace(link, dest)
+                    self.files_deduplicated += 1
+                    return
+            
+            # dest now holds this content: forget what it held before
+            objects = {h: e for h, e in objects.items()
+                       if isinstance(e, dict) and e['path'] != str(dest)}
+            st = os.stat(dest)
+            objects[sha256] = {'path': str(dest), 'ino': st.st_ino, 'size': st.st_size}
+            self.write_json(objects_path, objects)
+    
+    def stats(self):
+        return {
+            'queued': sorted(self.queued),
+            'stories_imported': self.stories_imported,
+            'files_copied': self.files_copied,
+            'files_deduplicated': self.files_deduplicated,
+            'bytes_copied': self.bytes_copied,
+            'failures': self.failures,
+        }
+
+
+class Watchdog:
+    """Thread heartbeats, latency targets and the systemd watchdog
+    
+    systemd is only pinged while every registered thread has sent a
+    heartbeat recently, no measurement has been outstanding longer than
+    its limit, and recent latencies meet their targets. When that stops
+    being true, all thread stacks are written to the log so the hang can
+    be diagnosed after systemd restarts the service.
+    """
+    
+    CHECK_INTERVAL = 1.0
+    HEARTBEAT_TIMEOUT = 15.0
+    PLAYBACK_STALL_LIMIT = 10.0
+    RECENT_SAMPLES = 5          # Median of these must meet the target
+    HISTORY = 200
+    
+    def __init__(self, log_file, targets):
+        """targets: {name: (target_seconds, limit_seconds)}"""
+        self.log_file = log_file
+        self.targets = targets
+        self.lock = Lock()
+        
+        self.heartbeats = {}
+        self.pending = {}
+        self.samples = {name: deque(maxlen=self.HISTORY) for name in targets}
+        self.violations = {name: 0 for name in targets}
+        self.stalls = 0
+        self.pings = 0
+        self.healthy = True
+        self.problem = None
+        self.stalled_since = None
+        
+        self.notify_socket = os.environ.get('NOTIFY_SOCKET')
+        usec = os.environ.get('WATCHDOG_USEC')
+        self.ping_interval = int(usec) / 3_000_000 if usec else 10.0
+        self.last_ping = 0.0
+        
+        self.stop_event = Event()
+        self.thread = Thread(target=self.run, name='storybox-watchdog', daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+        self.notify('STOPPING=1')
+    
+    # Reporting, called from the StoryBox threads
+    
+    def heartbeat(self, name):
+        self.heartbeats[name] = time.monotonic()
+    
+    def begin(self, name):
+        """Start timing an operation (e.g. a button press)"""
+        with self.lock:
+            self.pending.setdefault(name, time.monotonic())
+    
+    def end(self, name):
+        """Finish timing an operation, if one was started"""
+        with self.lock:
+            started = self.pending.pop(name, None)
+            if started is None:
+                return
+            latency = time.monotonic() - started
+            self.samples[name].append(latency)
+            if latency > self.targets[name][0]:
+                self.violations[name] += 1
+                print(f"⚠ SLO {name}: {latency:.2f}s (target {self.targets[name][0]}s)")
+    
+    def cancel(self, name):
+        """Forget an operation that will never finish (e.g. nothing to play)"""
+        with self.lock:
+            self.pending.pop(name, None)
+    
+    def playback_stalled(self, stalled):
+        """Monitor thread reports whether the mixer has stopped making progress"""
+        if stalled and self.stalled_since is None:
+            self.stalled_since = time.monotonic()
+            self.stalls += 1
+        elif not stalled:
+            self.stalled_since = None
+    
+    # Checking
+    
+    def check(self):
+        """Return None when healthy, or a description of the problem"""
+        now = time.monotonic()
+        for name, last in list(self.heartbeats.items()):
+            if now - last > self.HEARTBEAT_TIMEOUT:
+                return f"thread '{name}' silent for {now - last:.0f}s"
+        
+        with self.lock:
+            for name, started in self.pending.items():
+                if now - started > self.targets[name][1]:
+                    return f"{name} waiting {now - started:.1f}s"
+            
+            for name, samples in self.samples.items():
+                recent = sorted(list(samples)[-self.RECENT_SAMPLES:])
+                if len(recent) == self.RECENT_SAMPLES and \
+                        recent[len(recent) // 2] > self.targets[name][0]:
+                    return f"{name} median {recent[len(recent) // 2]:.2f}s"
+        
+        if self.stalled_since and now - self.stalled_since > self.PLAYBACK_STALL_LIMIT:
+            return f"playback stalled for {now - self.stalled_since:.0f}s"
+        return None
+    
+    def run(self):
+        while not self.stop_event.wait(self.CHECK_INTERVAL):
+            problem = self.check()
+            
+            if problem and self.healthy:
+                print(f"✗ Watchdog: {problem}")
+                self.dump_stacks(problem)
+            elif not problem and not self.healthy:
+                print("✓ Watchdog: recovered")
+            self.healthy = problem is None
+            self.problem = problem
+            
+            if self.healthy and time.monotonic() - self.last_ping >= self.ping_interval:
+                self.notify('WATCHDOG=1')
+                self.last_ping = time.monotonic()
+                self.pings += 1
+    
+    def dump_stacks(self, problem):
+        """Append every thread's stack to the watchdog log"""
+        names = {t.ident: t.name for t in threading.enumerate()}
+        lines = [f"=== {time.strftime('%Y-%m-%d %H:%M:%S')} {problem}"]
+        for ident, frame in sys._current_frames().items():
+            lines.append(f"--- {names.get(ident, ident)}")
+            lines.append(''.join(traceback.format_stack(frame)).rstrip())
+        
+        try:
+            with open(self.log_file, 'a') as f:
+                f.write('\n'.join(lines) + '\n')
+        except Exception as e:
+            print(f"✗ Failed to write watchdog log: {e}")
+    
+    def notify(self, message):
+        """Send a message to systemd (sd_notify protocol)"""
+        if not self.notify_socket:
+            return
+        address = self.notify_socket
+        if address.startswith('@'):
+            address = '\0' + address[1:]
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+                sock.connect(address)
+                sock.sendall(message.encode())
+        except Exception as e:
+            print(f"✗ systemd notify failed: {e}")
+    
+    def stats(self):
+        with self.lock:
+            slos = {name: dict(latency_percentiles(self.samples[name]),
+                               target_ms=self.targets[name][0] * 1000,
+                               violations=self.violations[name])
+                    for name in self.targets}
+        return {
+            'healthy': self.healthy,
+            'problem': self.problem,
+            'slo': slos,
+            'playback_stalls': self.stalls,
+            'pings': self.pings,
+        }
+
+
+class MediaUnavailable(Exception):
+    """A USB stick did not answer in time, or is known to be failing"""
+
+
+class MediaRequest:
+    """One filesystem call waiting for a MediaAccess worker"""
+    
+    def __init__(self, device, fn, args):
+        self.device = device
+        self.fn = fn
+        self.args = args
+        self.done = Event()
+        self.result = None
+        self.error = None
+        self.started = None
+        self.cancelled = False
+
+
+class MediaAccess:
+    """Deadline-bounded filesystem access for flaky USB media
+    
+    Calls run on worker threads while the caller waits up to a deadline.
+    A stick that stops answering leaves a worker stuck in uninterruptible
+    I/O, not the button or monitor thread: the caller gets
+    MediaUnavailable and a fresh worker takes over. Each mount has a
+    circuit breaker that fails calls immediately after repeated timeouts
+    or I/O errors, then lets a single trial call through after a cooldown.
+    Each mount may only tie up DEVICE_WORKERS workers, so one hung stick
+    cannot starve the others. SD card ('local') calls run inline.
+    """
+    
+    DEADLINE = 1.5              # Seconds per call
+    WORKERS = 2
+    MAX_WORKERS = 6             # Including workers stuck in I/O
+    DEVICE_WORKERS = 3          # Calls in flight per mount (enough to trip the breaker)
+    BREAKER_THRESHOLD = 3       # Consecutive failures before opening
+    BREAKER_COOLDOWN = 10.0     # Seconds before a trial call
+    FAULT_ERRNOS = {errno.EIO, errno.ENODEV, errno.ENXIO, errno.ETIMEDOUT,
+                    errno.ESTALE, errno.ENOTCONN}
+    AUDIO_EXTENSIONS = ('.mp3', '.wav', '.ogg', '.flac', '.m4a', '.m4b')
+    
+    def __init__(self, usb_base):
+        self.usb_base = Path(usb_base)
+        self.requests = queue.Queue()
+        self.lock = Lock()
+        self.workers = 0
+        self.idle_workers = 0
+        self.devices = {}
+        
+        for _ in range(self.WORKERS):
+            self.add_worker()
+    
+    def device_for(self, path):
+        """Mount point a path lives on ('local' for the SD card)"""
+        try:
+            parts = Path(path).relative_to(self.usb_base).parts
+        except ValueError:
+            return 'local'
+        return str(self.usb_base / parts[0]) if parts else str(self.usb_base)
+    
+    def device_stats(self, device):
+        if device not in self.devices:
+            self.devices[device] = {
+                'state': 'closed', 'failures': 0, 'opened_at': None,
+                'calls': 0, 'timeouts': 0, 'stalls': 0, 'errors': 0,
+                'rejected': 0, 'trips': 0, 'in_flight': 0,
+            }
+        return self.devices[device]
+    
+    # Workers
+    
+    def add_worker(self):
+        self.workers += 1
+        Thread(target=self.worker_loop, name=f'storybox-media-{self.workers}',
+               daemon=True).start()
+    
+    def worker_loop(self):
+        while True:
+            with self.lock:
+                self.idle_workers += 1
+            request = self.requests.get()
+            with self.lock:
+                self.idle_workers -= 1
+                stats = self.device_stats(request.device)
+                skip = request.cancelled or stats['state'] == 'open'
+                if not skip:
+                    request.started = time.monotonic()
+            
+            if skip:
+                request.error = MediaUnavailable(f"{request.device} unavailable")
+            else:
+                try:
+                    request.result = request.fn(*request.args)
+                except Exception as e:
+                    request.error = e
+            with self.lock:
+                stats['in_flight'] -= 1
+            request.done.set()
+            
+            # Workers added to replace stuck ones retire once things settle
+            with self.lock:
+                if self.workers > self.WORKERS and self.requests.empty():
+                    self.workers -= 1
+                    return
+    
+    # Calls
+    
+    def call(self, path, fn, *args, deadline=None):
+        """Run fn(*args) for path's device, raising MediaUnavailable on timeout"""
+        device = self.device_for(path)
+        if device == 'local':
+            # The SD card holds the library fallback; never queue it
+            # behind a stuck stick
+            with self.lock:
+                self.device_stats(device)['calls'] += 1
+            return fn(*args)
+        
+        with self.lock:
+            stats = self.device_stats(device)
+            if stats['in_flight'] >= self.DEVICE_WORKERS:
+                # Earlier calls are still stuck; don't add another
+                stats['rejected'] += 1
+                raise MediaUnavailable(f"{device} busy")
+            cooling = stats['state'] == 'open' and \
+                time.monotonic() - stats['opened_at'] < self.BREAKER_COOLDOWN
+            if cooling or stats['state'] == 'half-open':
+                stats['rejected'] += 1
+                raise MediaUnavailable(f"{device} unavailable")
+            if stats['state'] == 'open':
+                # Cooldown over: this call is the trial
+                stats['state'] = 'half-open'
+            stats['calls'] += 1
+            stats['in_flight'] += 1
+            
+            if self.idle_workers == 0 and self.workers < self.MAX_WORKERS:
+                self.add_worker()
+        
+        request = MediaRequest(device, fn, args)
+        self.requests.put(request)
+        
+        if not request.done.wait(deadline or self.DEADLINE):
+            request.cancelled = True
+            with self.lock:
+                stats['timeouts'] += 1
+                if request.started is not None:
+                    stats['stalls'] += 1
+                self.record_failure(stats, device)
+            raise MediaUnavailable(f"{device} timed out")
+        
+        error = request.error
+        if isinstance(error, MediaUnavailable):
+            raise error
+        if isinstance(error, OSError) and error.errno in self.FAULT_ERRNOS:
+            with self.lock:
+                stats['errors'] += 1
+                self.record_failure(stats, device)
+            raise MediaUnavailable(f"{device}: {error}") from error
+        
+        # Any other answer, even FileNotFoundError, means the device responded
+        with self.lock:
+            stats['failures'] = 0
+            if stats['state'] != 'closed':
+                print(f"✓ Media back: {device}")
+            stats['state'] = 'closed'
+        
+        if error:
+            raise error
+        return request.result
+    
+    def record_failure(self, stats, device):
+        stats['failures'] += 1
+        if stats['state'] == 'half-open' or stats['failures'] >= self.BREAKER_THRESHOLD:
+            if stats['state'] != 'open':
+                stats['trips'] += 1
+                print(f"✗ Media unavailable: {device}")
+            stats['state'] = 'open'
+            stats['opened_at'] = time.monotonic()
+    
+    # Common operations, each a single worker call
+    
+    def exists(self, path):
+        return self.call(path, os.path.exists, str(path))
+    
+    def is_dir(self, path):
+        return self.call(path, os.path.isdir, str(path))
+    
+    def list_dirs(self, path):
+        """Sorted sub-directories of path"""
+        def scan(path):
+            with os.scandir(path) as entries:
+                return sorted(Path(e.path) for e in entries if e.is_dir())
+        return self.call(path, scan, str(path))
+    
+    def list_audio(self, folder):
+        """Sorted audio files in folder (any extension case)"""
+        def scan(folder):
+            with os.scandir(folder) as entries:
+                return sorted(Path(e.path) for e in entries
+                              if e.is_file() and
+                              os.path.splitext(e.name)[1].lower() in self.AUDIO_EXTENSIONS)
+        return self.call(folder, scan, str(folder))
+    
+    def stats(self):
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'idle_workers': self.idle_workers,
+                'devices': {device: {k: v for k, v in stats.items()
+                                     if k != 'opened_at'}
+                            for device, stats in self.devices.items()},
+            }
+
+
 class StoryBox:
     """Story Box Controller"""
     
@@ -28,6 +1924,11 @@ class StoryBox:
     # Paths
     USB_MOUNT_BASE = '/media/admin'
     STATE_FILE = '/home/admin/story_box/state.json'
+    CHAPTER_CACHE_DIR = '/home/admin/story_box/chapters'
+    METRICS_FILE = '/home/admin/story_box/metrics.json'
+    LIBRARY_DIR = '/home/admin/story_box/library'
+    VALIDATION_CACHE = '/home/admin/story_box/validation.json'
+    WATCHDOG_LOG = '/home/admin/story_box/watchdog.log'
     SOUNDS_DIR = '/usr/share/storybox/sounds'
     
     # Audio settings
@@ -35,6 +1936,7 @@ class StoryBox:
     VOLUME_STEP = 0.1
     VOLUME_MIN = 0.0
     VOLUME_MAX = 0.85   # Child hearing protection
+    SPEED_STEPS = [0.8, 1.0, 1.25]
     
     # LCD
     LCD_ADDRESS = 0x27
@@ -42,6 +1944,24 @@ class StoryBox:
     # Timings
     SELECTION_MODE_HOLD_TIME = 2.0  # Hold Prev+Next for story selection
     SHUTDOWN_HOLD_TIME = 5.0        # Hold Vol-+Vol+ for shutdown
+    BAD_TRACK_ROTATE_TIME = 2.0     # Selection mode: seconds per bad track name
+    MOUNT_TIMEOUT = 3.0             # Seconds to wait for the USB stick to mount
+    
+    # Latency targets (target, limit) in seconds. Missing a target
+    # repeatedly, or exceeding a limit once, stops the systemd watchdog ping
+    SLO_TARGETS = {
+        'press_to_response': (0.5, 10.0),   # Button press to LCD update
+        'track_gap': (1.5, 10.0),           # Track end to next track playing
+    }
+    METRICS_INTERVAL = 30.0         # Seconds between metrics exports
+    
+    # Background work (cores 0-1 are left to the mixer and input threads)
+    INTERACTIVE_CPUS = {0, 1}
+    BACKGROUND_WORKERS = 2
+    BACKGROUND_RESERVED = 1         # Extra worker kept for state saves
+    BACKGROUND_NICE = 10
+    BACKGROUND_CPUS = {2, 3}
+    IMPORT_ON_SELECT = True         # Copy stories to the SD card when chosen
     
     def __init__(self):
         """Initialize Story Box"""
@@ -49,6 +1969,12 @@ class StoryBox:
         print("STORY BOX INITIALIZING")
         print("=" * 60)
         
+        # Before any thread starts, so the mixer and our threads inherit it
+        self.pin_interactive_threads()
+        
+        # Heartbeats and latency targets, reported to systemd
+        self.watchdog = Watchdog(self.WATCHDOG_LOG, self.SLO_TARGETS)
+        
         # Initialize LCD
         try:
             self.lcd = CharLCD(
@@ -116,23 +2042,69 @@ class StoryBox:
         self.sounds = {}
         self.load_sounds()
         
+        # Variable speed playback streams into reserved channel 0
+        self.speed = 1.0
+        self.music = pygame.mixer.music
+        self.stretch_player = None
+        if StretchedPlayer.available():
+            pygame.mixer.set_reserved(1)
+            self.stretch_player = StretchedPlayer(0)
+            self.stretch_player.set_volume(self.volume)
+            print("✓ Speed control available")
+        else:
+            print("⚠ Speed control needs numpy and ffmpeg")
+        
         # Playback state
         self.current_folder = None
         self.playlist = []
         self.current_track_index = 0
         self.is_playing = False
         self.is_paused = False
+        # Held while a track is (re)started so the monitor never sees the
+        # gap between load and play as the track ending
+        self.playback_lock = RLock()
+        
+        # Chapters inside the current track (long single-file audiobooks)
+        self.chapter_index = ChapterIndex(self.CHAPTER_CACHE_DIR)
+        self.chapters = []
+        self.current_chapter_index = 0
+        self.track_start_position = 0.0
+        self.music_file = None
         
         # Story selection
         self.available_folders = []
         self.selected_folder_index = 0
         self.in_selection_mode = False
+        self.media_unavailable = False
+        self.mount_process = None
+        self.selection_bad_tracks = []
+        self.selection_rotation = 0
+        self.selection_shown_at = 0.0
+        self.selection_line1 = ""
         
         # Auto-play setting
         self.auto_play = True  # Auto-play on startup
         
         # Threads
         self.stop_event = Event()
+        self.state_lock = Lock()
+        self.pending_save = None
+        self.index_task = None
+        
+        cpus = {c for c in self.BACKGROUND_CPUS if c < (os.cpu_count() or 1)}
+        self.scheduler = TaskScheduler(
+            workers=self.BACKGROUND_WORKERS,
+            reserved=self.BACKGROUND_RESERVED,
+            nice=self.BACKGROUND_NICE,
+            cpus=cpus or None,
+            health=SystemHealth(self.AUDIO_CARD)
+        )
+        self.importer = StoryImporter(self.LIBRARY_DIR, health=self.scheduler.health)
+        self.media = MediaAccess(self.USB_MOUNT_BASE)
+        self.validator = TrackValidator(self.VALIDATION_CACHE)
+        self.validate_task = None
+        
+        self.watchdog.start()
         
         self.monitor_thread = Thread(target=self.monitor_playback, daemon=True)
         self.monitor_thread.start()
@@ -145,6 +2117,7 @@ class StoryBox:
         # Play startup sound
         self.play_sound('startup')
         self.update_display("Ready!", "Insert USB")
+        self.watchdog.notify('READY=1')
     
     def load_sounds(self):
         """Load sound effects"""
@@ -184,17 +2157,50 @@ class StoryBox:
         state = {
             'folder_path': str(self.current_folder),
             'track_index': self.current_track_index,
+            'chapter_index': self.current_chapter_index,
             'volume': self.volume,
+            'speed': self.speed,
             'auto_play': self.auto_play
         }
         
         try:
-            with open(self.STATE_FILE, 'w') as f:
-                json.dump(state, f)
+            with self.state_lock:
+                with open(self.STATE_FILE, 'w') as f:
+                    json.dump(state, f)
             print(f"✓ State saved")
         except Exception as e:
             print(f"✗ Failed to save state: {e}")
     
+    def request_save(self):
+        """Save state on a background worker, merging repeated requests"""
+        if self.pending_save and self.pending_save.started is None \
+                and not self.pending_save.cancelled:
+            return
+        self.pending_save = self.scheduler.submit(
+            self.save_state,
+            priority=TaskScheduler.PRIORITY_HIGH,
+            name='save_state'
+        )
+    
+    def export_metrics(self):
+        """Write runtime metrics to METRICS_FILE"""
+        metrics = {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'scheduler': self.scheduler.stats(),
+            'import': self.importer.stats(),
+            'validation': self.validator.stats(),
+            'watchdog': self.watchdog.stats(),
+            'media': self.media.stats(),
+        }
+        
+        try:
+            tmp_file = self.METRICS_FILE + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(metrics, f, indent=2)
+            os.replace(tmp_file, self.METRICS_FILE)
+        except Exception as e:
+            print(f"✗ Failed to export metrics: {e}")
+    
     def load_state(self):
         """Load previous playback state"""
         if not os.path.exists(self.STATE_FILE):
@@ -206,26 +2212,30 @@ class StoryBox:
             
             folder_path = Path(state['folder_path'])
             
-            if folder_path.exists() and folder_path.is_dir():
-                audio_extensions = ['*.mp3', '*.MP3', '*.wav', '*.WAV',
-                                  '*.ogg', '*.OGG', '*.flac', '*.FLAC',
-                                  '*.m4a', '*.M4A']
-                
-                audio_files = []
-                for ext in audio_extensions:
-                    audio_files.extend(folder_path.glob(ext))
+            # Prefer the library copy, and fall back to it without the stick
+            local = self.importer.local_copy(folder_path)
+            if local:
+                folder_path = local
+            
+            if self.media.is_dir(folder_path):
+                audio_files = self.media.list_audio(folder_path)
                 
                 if audio_files:
                     self.current_folder = folder_path
-                    self.playlist = sorted(audio_files)
+                    self.playlist = audio_files
                     self.current_track_index = state.get('track_index', 0)
                     
                     if self.current_track_index >= len(self.playlist):
                         self.current_track_index = 0
+                    self.current_chapter_index = state.get('chapter_index', 0)
                     
                     self.volume = state.get('volume', 0.7)
                     self.auto_play = state.get('auto_play', True)
-                    pygame.mixer.music.set_volume(self.volume)
+                    self.apply_volume()
+                    
+                    speed = state.get('speed', 1.0)
+                    if speed in self.SPEED_STEPS and self.stretch_player:
+                        self.speed = speed
                     
                     folder_name = self.current_folder.name.replace('_', ' ')
                     if len(folder_name) > 3 and folder_name[:2].isdigit():
@@ -235,6 +2245,7 @@ class StoryBox:
                     print(f"✓ Track: {self.current_track_index + 1}/{len(self.playlist)}")
                     
                     self.update_display(folder_name[:16], "Ready to play")
+                    self.queue_import(self.current_folder)
                     return True
             
             return False
@@ -245,6 +2256,7 @@ class StoryBox:
     
     def update_display(self, line1, line2=""):
         """Update LCD display"""
+        self.watchdog.end('press_to_response')
         if not self.lcd:
             return
         
@@ -258,16 +2270,29 @@ class StoryBox:
         except Exception as e:
             print(f"LCD error: {e}")
     
+    def track_display_name(self):
+        """Name of the current chapter, or of the current track"""
+        if self.chapters:
+            return self.chapters[self.current_chapter_index]['title'][:16]
+        
+        track = self.playlist[self.current_track_index]
+        track_name = track.stem.replace('_', ' ')
+        if len(track_name) > 3 and track_name[:2].isdigit():
+            track_name = track_name[3:]
+        return track_name[:16]
+    
     def shutdown_sequence(self):
         """Perform safe shutdown"""
         print("\n→ Shutdown initiated")
         
         # Save state
+        self.scheduler.shutdown()
+        self.watchdog.stop()
         self.save_state()
         
         # Stop playback
         if self.is_playing:
-            pygame.mixer.music.stop()
+            self.music.stop()
         
         # Visual feedback
         self.update_display("Shutting down", "Please wait...")
@@ -307,6 +2332,8 @@ class StoryBox:
         shutdown_hold_start = None
         
         while not self.stop_event.is_set():
+            self.watchdog.heartbeat('buttons')
+            
             # Check for shutdown combo (Vol- + Vol+ held together)
             vol_down_pressed = GPIO.input(self.PIN_VOL_DOWN) == 0
             vol_up_pressed = GPIO.input(self.PIN_VOL_UP) == 0
@@ -332,11 +2359,7 @@ class StoryBox:
                         if self.is_paused:
                             self.update_display(story_name, "Paused")
                         else:
-                            track = self.playlist[self.current_track_index]
-                            track_name = track.stem.replace('_', ' ')
-                            if len(track_name) > 3 and track_name[:2].isdigit():
-                                track_name = track_name[3:]
-                            self.update_display(story_name, track_name[:16])
+                            self.update_display(story_name, self.track_display_name())
                     else:
                         self.update_display("Ready!", "")
                 shutdown_hold_start = None
@@ -361,6 +2384,7 @@ class StoryBox:
                     state = GPIO.input(pin)
                     
                     if state == 0 and prev_states[pin] == 1:
+                        self.watchdog.begin('press_to_response')
                         self.play_sound('button')
                         
                         if pin == self.PIN_PLAY:
@@ -380,24 +2404,44 @@ class StoryBox:
             elif self.in_selection_mode:
                 # Selection mode button handling
                 if GPIO.input(self.PIN_NEXT) == 0 and prev_states[self.PIN_NEXT] == 1:
+                    self.watchdog.begin('press_to_response')
                     self.play_sound('button')
                     self.browse_next_story()
                     time.sleep(0.3)
                 
                 if GPIO.input(self.PIN_PREV) == 0 and prev_states[self.PIN_PREV] == 1:
+                    self.watchdog.begin('press_to_response')
                     self.play_sound('button')
                     self.browse_prev_story()
                     time.sleep(0.3)
                 
                 if GPIO.input(self.PIN_PLAY) == 0 and prev_states[self.PIN_PLAY] == 1:
+                    self.watchdog.begin('press_to_response')
                     self.play_sound('button')
                     self.select_current_story()
                     time.sleep(0.3)
                 
+                if GPIO.input(self.PIN_VOL_DOWN) == 0 and prev_states[self.PIN_VOL_DOWN] == 1:
+                    self.watchdog.begin('press_to_response')
+                    self.play_sound('button')
+                    self.change_speed(-1)
+                
+                if GPIO.input(self.PIN_VOL_UP) == 0 and prev_states[self.PIN_VOL_UP] == 1:
+                    self.watchdog.begin('press_to_response')
+                    self.play_sound('button')
+                    self.change_speed(1)
+                
+                if self.in_selection_mode:
+                    self.rotate_bad_tracks()
+                
                 # Update prev states
                 for pin in prev_states.keys():
                     prev_states[pin] = GPIO.input(pin)
             
+            # Handlers have returned; a press that changed nothing on screen
+            # (e.g. Next with no story loaded) is not left timing forever
+            self.watchdog.cancel('press_to_response')
+            
             time.sleep(0.05)
     
     def enter_selection_mode(self):
@@ -412,43 +2456,107 @@ class StoryBox:
             self.selected_folder_index = 0
             self.show_story_selection()
             self.play_sound('story_loaded')
+        elif self.media_unavailable:
+            self.update_display("USB not", "responding")
+            self.play_sound('error')
+            time.sleep(2)
+            self.in_selection_mode = False
         else:
             self.update_display("No stories", "found!")
             self.play_sound('error')
             time.sleep(2)
             self.in_selection_mode = False
     
+    def queue_import(self, folder):
+        """Copy a USB story into the library, or bring a library copy up to date"""
+        if not self.IMPORT_ON_SELECT:
+            return
+        if self.importer.in_library(folder):
+            # Re-import from the stick it came from, if that is plugged in
+            folder = self.importer.source_of(folder)
+            try:
+                if folder is None or not self.media.is_dir(folder):
+                    return
+            except MediaUnavailable:
+                return
+        
+        # Completed imports are queued too: import_story compares the stick
+        # with the journal and only copies tracks added or replaced since
+        if folder.name in self.importer.queued:
+            return
+        
+        self.importer.queued.add(folder.name)
+        self.scheduler.submit(self.importer.import_story, folder,
+                              priority=TaskScheduler.PRIORITY_IDLE,
+                              name='import')
+    
+    def pin_interactive_threads(self):
+        """Keep the mixer, button and monitor threads on INTERACTIVE_CPUS
+        
+        Threads inherit the affinity of the thread that starts them;
+        background workers move themselves to BACKGROUND_CPUS.
+        """
+        cpus = {c for c in self.INTERACTIVE_CPUS if c < (os.cpu_count() or 1)}
+        if not cpus or not hasattr(os, 'sched_setaffinity'):
+            return
+        try:
+            os.sched_setaffinity(0, cpus)
+            print(f"✓ Playback pinned to CPUs {sorted(cpus)}")
+        except Exception as e:
+            print(f"⚠ CPU pinning failed: {e}")
+    
+    def mount_usb(self):
+        """Make sure the USB stick is mounted, without waiting on a dead one"""
+        # A mount stuck reading the superblock can't be killed; leave it
+        # and don't start another until it has finished
+        if self.mount_process and self.mount_process.poll() is None:
+            self.media_unavailable = True
+            return
+        
+        self.mount_process = subprocess.Popen(
+            ['sudo', 'mount', '/dev/sda1', '/media/admin/STORYBOX'],
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            self.mount_process.wait(timeout=self.MOUNT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            print("✗ USB mount timed out")
+            self.media_unavailable = True
+    
     def scan_all_folders(self):
         """Scan USB for all story folders"""
-        os.system('sudo mount /dev/sda1 /media/admin/STORYBOX 2>/dev/null')
+        self.media_unavailable = False
+        self.mount_usb()
         
         self.available_folders = []
         
-        if not os.path.exists(self.USB_MOUNT_BASE):
-            return
-        
         try:
-            for mount in Path(self.USB_MOUNT_BASE).iterdir():
-                if mount.is_dir():
-                    folders = sorted([f for f in mount.iterdir() if f.is_dir()])
+            for mount in self.find_usb_mounts():
+                try:
+                    folders = self.media.list_dirs(mount)
                     
                     for folder in folders:
                         # Check if folder has audio
-                        audio_extensions = ['*.mp3', '*.MP3', '*.wav', '*.WAV',
-                                          '*.ogg', '*.OGG', '*.flac', '*.FLAC',
-                                          '*.m4a', '*.M4A']
-                        
-                        has_audio = False
-                        for ext in audio_extensions:
-                            if list(folder.glob(ext)):
-                                has_audio = True
-                                break
-                        
-                        if has_audio:
+                        if self.media.list_audio(folder):
                             self.available_folders.append(folder)
+                except MediaUnavailable as e:
+                    # Skip a stuck stick, keep whatever else was found
+                    print(f"✗ Skipping {mount.name}: {e}")
+                    self.media_unavailable = True
         except Exception as e:
             print(f"Error scanning folders: {e}")
         
+        # One catalogue: library copies replace their USB originals
+        try:
+            self.available_folders = [self.importer.local_copy(f) or f
+                                      for f in self.available_folders]
+            shown = set(self.available_folders)
+            self.available_folders += [f for f in self.importer.local_stories()
+                                       if f not in shown]
+            self.available_folders.sort(key=lambda f: f.name)
+        except Exception as e:
+            print(f"Error scanning library: {e}")
+        
         print(f"Found {len(self.available_folders)} stories")
     
     def show_story_selection(self):
@@ -463,10 +2571,39 @@ class StoryBox:
         if len(folder_name) > 3 and folder_name[:2].isdigit():
             folder_name = folder_name[3:]
         
-        self.update_display(
-            f"Story {self.selected_folder_index + 1}/{len(self.available_folders)}",
-            folder_name[:16]
-        )
+        # Flag stories with known-bad tracks; their names rotate on line 2
+        self.selection_bad_tracks = self.validator.bad_tracks(folder)
+        self.selection_rotation = 0
+        self.selection_shown_at = time.time()
+        
+        line1 = f"Story {self.selected_folder_index + 1}/{len(self.available_folders)}"
+        if self.selection_bad_tracks:
+            line1 += f" !{len(self.selection_bad_tracks)}"
+        self.selection_line1 = line1
+        
+        self.update_display(line1, folder_name[:16])
+    
+    def rotate_bad_tracks(self):
+        """Cycle line 2 between the story name and its bad tracks"""
+        if not self.selection_bad_tracks:
+            return
+        if time.time() - self.selection_shown_at < self.BAD_TRACK_ROTATE_TIME:
+            return
+        
+        self.selection_rotation = (self.selection_rotation + 1) % \
+            (len(self.selection_bad_tracks) + 1)
+        self.selection_shown_at = time.time()
+        
+        if self.selection_rotation == 0:
+            path = self.available_folders[self.selected_folder_index]
+            prefix, name = "", path.name.replace('_', ' ')
+        else:
+            path = self.selection_bad_tracks[self.selection_rotation - 1]
+            prefix, name = "Bad:", path.stem.replace('_', ' ')
+        if len(name) > 3 and name[:2].isdigit():
+            name = name[3:]
+        
+        self.update_display(self.selection_line1, (prefix + name)[:16])
     
     def browse_next_story(self):
         """Browse to next story"""
@@ -498,18 +2635,19 @@ class StoryBox:
         folder = self.available_folders[self.selected_folder_index]
         
         # Load this folder
-        audio_extensions = ['*.mp3', '*.MP3', '*.wav', '*.WAV',
-                          '*.ogg', '*.OGG', '*.flac', '*.FLAC',
-                          '*.m4a', '*.M4A']
-        
-        audio_files = []
-        for ext in audio_extensions:
-            audio_files.extend(folder.glob(ext))
+        try:
+            audio_files = self.media.list_audio(folder)
+        except (MediaUnavailable, OSError) as e:
+            print(f"✗ Failed to load story: {e}")
+            self.update_display("USB not", "responding")
+            self.play_sound('error')
+            return
         
         if audio_files:
             self.current_folder = folder
-            self.playlist = sorted(audio_files)
+            self.playlist = audio_files
             self.current_track_index = 0
+            self.current_chapter_index = 0
             
             folder_name = folder.name.replace('_', ' ')
             if len(folder_name) > 3 and folder_name[:2].isdigit():
@@ -521,6 +2659,7 @@ class StoryBox:
             time.sleep(1)
             
             self.save_state()
+            self.queue_import(folder)
             self.in_selection_mode = False
             
             # Auto-start playing
@@ -530,44 +2669,50 @@ class StoryBox:
         """Find USB devices"""
         usb_mounts = []
         
-        if not os.path.exists(self.USB_MOUNT_BASE):
-            return usb_mounts
-        
         try:
-            for mount in Path(self.USB_MOUNT_BASE).iterdir():
-                if mount.is_dir():
-                    usb_mounts.append(mount)
-        except:
+            if not self.media.exists(self.USB_MOUNT_BASE):
+                return usb_mounts
+            usb_mounts = self.media.list_dirs(self.USB_MOUNT_BASE)
+        except MediaUnavailable as e:
+            print(f"✗ USB mounts unavailable: {e}")
+            self.media_unavailable = True
+        except OSError:
             pass
         
         return usb_mounts
     
     def scan_for_audio(self):
         """Scan for audio files (loads first story found)"""
-        os.system('sudo mount /dev/sda1 /media/admin/STORYBOX 2>/dev/null')
+        self.mount_usb()
         
         usb_mounts = self.find_usb_mounts()
         
         if not usb_mounts:
-            return None
+            # No stick: play from the library instead
+            usb_mounts = [self.importer.library_dir]
+            if not self.importer.local_stories():
+                return None
         
         for usb_mount in usb_mounts:
-            folders = sorted([f for f in usb_mount.iterdir() if f.is_dir()])
-            
-            if not folders:
-                folders = [usb_mount]
-            
-            for folder in folders:
-                audio_extensions = ['*.mp3', '*.MP3', '*.wav', '*.WAV',
-                                  '*.ogg', '*.OGG', '*.flac', '*.FLAC',
-                                  '*.m4a', '*.M4A']
+            try:
+                if usb_mount == self.importer.library_dir:
+                    folders = self.importer.local_stories()
+                else:
+                    folders = self.media.list_dirs(usb_mount)
                 
-                audio_files = []
-                for ext in audio_extensions:
-                    audio_files.extend(folder.glob(ext))
+                if not folders:
+                    folders = [usb_mount]
                 
-                if audio_files:
-                    return folder, sorted(audio_files)
+                for folder in folders:
+                    folder = self.importer.local_copy(folder) or folder
+                    
+                    audio_files = self.media.list_audio(folder)
+                    
+                    if audio_files:
+                        return folder, audio_files
+            except MediaUnavailable as e:
+                print(f"✗ Skipping {usb_mount.name}: {e}")
+                self.media_unavailable = True
         
         return None
     
@@ -576,6 +2721,7 @@ class StoryBox:
         self.update_display("Scanning...", "Please wait")
         print("\nScanning for audio...")
         
+        self.media_unavailable = False
         result = self.scan_for_audio()
         
         if result:
@@ -583,6 +2729,7 @@ class StoryBox:
             self.current_folder = folder
             self.playlist = files
             self.current_track_index = 0
+            self.current_chapter_index = 0
             
             folder_name = folder.name.replace('_', ' ')
             if len(folder_name) > 3 and folder_name[:2].isdigit():
@@ -594,11 +2741,15 @@ class StoryBox:
             self.update_display(folder_name[:16], f"{len(files)} tracks")
             self.play_sound('story_loaded')
             self.save_state()
+            self.queue_import(folder)
             time.sleep(2)
             return True
         else:
             print("✗ No audio found")
-            self.update_display("No audio found", "Insert USB")
+            if self.media_unavailable:
+                self.update_display("USB not", "responding")
+            else:
+                self.update_display("No audio found", "Insert USB")
             self.play_sound('error')
             return False
     
@@ -607,37 +2758,133 @@ class StoryBox:
         if not self.playlist:
             return
         
-        track = self.playlist[self.current_track_index]
-        
-        try:
-            pygame.mixer.music.load(str(track))
-            pygame.mixer.music.play()
-            self.is_playing = True
-            self.is_paused = False
-            GPIO.output(self.PIN_LED, GPIO.LOW)
-            
-            story_name = self.current_folder.name.replace('_', ' ')
-            if len(story_name) > 3 and story_name[:2].isdigit():
-                story_name = story_name[3:]
-            story_name = story_name[:16]
-            
-            track_name = track.stem.replace('_', ' ')
-            if len(track_name) > 3 and track_name[:2].isdigit():
-                track_name = track_name[3:]
-            
-            self.update_display(story_name, track_name[:16])
-            
-            print(f"▶ Playing [{self.current_track_index + 1}/{len(self.playlist)}]: {track.name}")
+        with self.playback_lock:
+            track = self.playlist[self.current_track_index]
             
+            try:
+                self.load_chapters(track)
+                start = 0.0
+                if self.chapters:
+                    start = self.chapters[self.current_chapter_index]['start']
+                
+                self.start_music(track, start)
+                self.is_playing = True
+                self.is_paused = False
+                GPIO.output(self.PIN_LED, GPIO.LOW)
+                
+                story_name = self.current_folder.name.replace('_', ' ')
+                if len(story_name) > 3 and story_name[:2].isdigit():
+                    story_name = story_name[3:]
+                story_name = story_name[:16]
+                
+                self.update_display(story_name, self.track_display_name())
+                
+                print(f"▶ Playing [{self.current_track_index + 1}/{len(self.playlist)}]: {track.name}")
+                if self.chapters:
+                    print(f"  Chapter {self.current_chapter_index + 1}/{len(self.chapters)}: "
+                          f"{self.chapters[self.current_chapter_index]['title']}")
+                
+                self.queue_validation()
+                self.watchdog.end('track_gap')
+                
+            except MediaUnavailable as e:
+                print(f"✗ Error: {e}")
+                self.update_display("USB not", "responding")
+                self.play_sound('error')
+                GPIO.output(self.PIN_LED, GPIO.HIGH)
+            except Exception as e:
+                print(f"✗ Error: {e}")
+                if not isinstance(e, OSError):
+                    self.validator.mark_bad(track, str(e)[:80])
+                    self.scheduler.submit(self.validator.confirm_bad, track,
+                                          name='confirm_bad')
+                self.update_display("Error playing", "track")
+                self.play_sound('error')
+                GPIO.output(self.PIN_LED, GPIO.HIGH)
+    
+    def queue_validation(self):
+        """Check the rest of the story ahead of the playhead at idle priority"""
+        if self.validate_task:
+            self.validate_task.cancel()
+        
+        index = self.current_track_index
+        tracks = self.playlist[index + 1:] + self.playlist[:index + 1]
+        self.validate_task = self.scheduler.submit(
+            self.validator.validate_tracks, tracks, self.scheduler.health,
+            priority=TaskScheduler.PRIORITY_IDLE,
+            name='validate'
+        )
+    
+    def load_chapters(self, track):
+        """Load chapter markers for track and index it in the background"""
+        try:
+            # Reads the tag or cue sheet from the stick, so bound it
+            self.chapters = self.media.call(track, self.chapter_index.get, track)['chapters']
+        except MediaUnavailable:
+            raise
         except Exception as e:
-            print(f"✗ Error: {e}")
-            self.update_display("Error playing", "track")
-            self.play_sound('error')
-            GPIO.output(self.PIN_LED, GPIO.HIGH)
+            print(f"✗ Chapter index failed: {e}")
+            self.chapters = []
+        
+        if self.current_chapter_index >= len(self.chapters):
+            self.current_chapter_index = 0
+        
+        if self.index_task and self.index_task.args[0] != track:
+            self.index_task.cancel()
+        if self.chapters:
+            self.index_task = self.scheduler.submit(
+                self.chapter_index.build_seek_table, track,
+                priority=TaskScheduler.PRIORITY_IDLE,
+                name='seek_index'
+            )
+    
+    def start_music(self, track, position=0.0):
+        """Load track into the mixer and start it at position (seconds)"""
+        music = pygame.mixer.music
+        if self.speed != 1.0 and self.stretch_player:
+            music = self.stretch_player
+        if music is not self.music:
+            self.music.stop()
+            self.music = music
+        
+        if self.music is self.stretch_player:
+            self.stretch_player.set_speed(self.speed)
+            self.stretch_player.load(track)
+            self.stretch_player.play(start=position)
+            
+            if self.music_file:
+                self.music_file.close()
+                self.music_file = None
+            self.track_start_position = position
+            return
+        
+        seek = None
+        if position > 0:
+            seek = self.chapter_index.resolve(track, position)
+        
+        music_file = None
+        if seek:
+            # Start decoding at the indexed frame instead of scanning to it
+            position, offset = seek
+            music_file = SeekableSlice(track, offset)
+            pygame.mixer.music.load(music_file, 'mp3')
+            pygame.mixer.music.play()
+        else:
+            pygame.mixer.music.load(str(track))
+            pygame.mixer.music.play(start=position)
+        
+        if self.music_file:
+            self.music_file.close()
+        self.music_file = music_file
+        self.track_start_position = position
+    
+    def get_position(self):
+        """Playback position in the current track (seconds)"""
+        return self.track_start_position + max(0, self.music.get_pos()) / 1000
     
     def stop_playback(self):
         """Stop playback"""
-        pygame.mixer.music.stop()
+        self.music.stop()
         self.is_playing = False
         self.is_paused = False
         GPIO.output(self.PIN_LED, GPIO.HIGH)
@@ -656,7 +2903,7 @@ class StoryBox:
         """Pause/unpause"""
         if self.is_playing:
             if self.is_paused:
-                pygame.mixer.music.unpause()
+                self.music.unpause()
                 self.is_paused = False
                 GPIO.output(self.PIN_LED, GPIO.LOW)
                 
@@ -665,15 +2912,10 @@ class StoryBox:
                     story_name = story_name[3:]
                 story_name = story_name[:16]
                 
-                track = self.playlist[self.current_track_index]
-                track_name = track.stem.replace('_', ' ')
-                if len(track_name) > 3 and track_name[:2].isdigit():
-                    track_name = track_name[3:]
-                
-                self.update_display(story_name, track_name[:16])
+                self.update_display(story_name, self.track_display_name())
                 print("▶ Resumed")
             else:
-                pygame.mixer.music.pause()
+                self.music.pause()
                 self.is_paused = True
                 GPIO.output(self.PIN_LED, GPIO.HIGH)
                 
@@ -682,33 +2924,74 @@ class StoryBox:
                     story_name = story_name[3:]
                 self.update_display(story_name[:16], "Paused")
                 print("⏸ Paused")
-                self.save_state()
+                self.request_save()
     
-    def next_track(self):
-        """Next track"""
+    def next_track(self, auto_advance=False):
+        """Next chapter, or next track
+        
+        On auto-advance (the track finished) chapters are left to play
+        through, and tracks known to be bad are skipped.
+        """
         if not self.playlist:
             return
         
-        self.current_track_index += 1
-        if self.current_track_index >= len(self.playlist):
-            self.current_track_index = 0
-            print("↻ Loop to start")
+        if (self.chapters and not auto_advance and
+                self.current_chapter_index + 1 < len(self.chapters)):
+            self.current_chapter_index += 1
+            self.request_save()
+            self.play_current_track()
+            return
         
-        self.save_state()
+        for _ in range(len(self.playlist)):
+            self.current_track_index += 1
+            if self.current_track_index >= len(self.playlist):
+                self.current_track_index = 0
+                print("↻ Loop to start")
+            self.current_chapter_index = 0
+            
+            track = self.playlist[self.current_track_index]
+            if auto_advance:
+                try:
+                    bad = self.media.call(track, self.validator.is_bad, track)
+                except MediaUnavailable as e:
+                    print(f"⏭ Skipping unreadable track: {track.name} ({e})")
+                    continue
+                if bad:
+                    print(f"⏭ Skipping bad track: {track.name}")
+                    continue
+            
+            self.request_save()
+            self.stop_playback()
+            self.play_current_track()
+            
+            # A track that fails in the decoder is now marked bad; keep going
+            if self.is_playing or not auto_advance:
+                return
+        
+        print("✗ No playable tracks")
+        self.watchdog.cancel('track_gap')
         self.stop_playback()
-        self.play_current_track()
+        self.update_display("No playable", "tracks")
+        self.play_sound('error')
     
     def previous_track(self):
-        """Previous track"""
+        """Previous chapter, or previous track"""
         if not self.playlist:
             return
         
+        if self.chapters and self.current_chapter_index > 0:
+            self.current_chapter_index -= 1
+            self.request_save()
+            self.play_current_track()
+            return
+        
         self.current_track_index -= 1
         if self.current_track_index < 0:
             self.current_track_index = len(self.playlist) - 1
             print("↻ Loop to end")
+        self.current_chapter_index = 0
         
-        self.save_state()
+        self.request_save()
         self.stop_playback()
         self.play_current_track()
     
@@ -716,14 +2999,14 @@ class StoryBox:
         """Adjust volume"""
         self.volume = max(self.VOLUME_MIN,
                          min(self.VOLUME_MAX, self.volume + change))
-        pygame.mixer.music.set_volume(self.volume)
+        self.apply_volume()
         
         vol_percent = int(self.volume * 100)
         bar = "=" * (vol_percent // 7)
         self.update_display(f"Volume: {vol_percent}%", bar)
         print(f"🔊 Volume: {vol_percent}%")
         
-        self.save_state()
+        self.request_save()
         
         time.sleep(2)
         if self.is_playing and self.playlist:
@@ -735,21 +3018,96 @@ class StoryBox:
             if self.is_paused:
                 self.update_display(story_name, "Paused")
             else:
-                track = self.playlist[self.current_track_index]
-                track_name = track.stem.replace('_', ' ')
-                if len(track_name) > 3 and track_name[:2].isdigit():
-                    track_name = track_name[3:]
-                self.update_display(story_name, track_name[:16])
+                self.update_display(story_name, self.track_display_name())
+    
+    def apply_volume(self):
+        """Set the music volume on both playback paths"""
+        pygame.mixer.music.set_volume(self.volume)
+        if self.stretch_player:
+            self.stretch_player.set_volume(self.volume)
+    
+    def change_speed(self, step):
+        """Step playback speed down (-1) or up (+1)"""
+        if not self.stretch_player:
+            self.update_display("Speed control", "not available")
+            time.sleep(1.5)
+            self.show_story_selection()
+            return
+        
+        index = self.SPEED_STEPS.index(self.speed) if self.speed in self.SPEED_STEPS \
+            else self.SPEED_STEPS.index(1.0)
+        index = max(0, min(len(self.SPEED_STEPS) - 1, index + step))
+        self.speed = self.SPEED_STEPS[index]
+        
+        self.update_display("Speed", f"{self.speed:g}x")
+        print(f"⏩ Speed: {self.speed:g}x")
+        
+        # Restart where we are so the new speed is heard straight away
+        if self.is_playing and not self.is_paused and self.playlist:
+            track = self.playlist[self.current_track_index]
+            try:
+                with self.playback_lock:
+                    self.start_music(track, self.get_position())
+            except Exception as e:
+                print(f"✗ Error: {e}")
+        
+        self.request_save()
+        time.sleep(1.5)
+        self.show_story_selection()
     
     def monitor_playback(self):
         """Monitor for track end"""
+        last_export = time.monotonic()
+        last_position = None
+        
         while not self.stop_event.is_set():
-            if self.is_playing and not self.is_paused:
-                if not pygame.mixer.music.get_busy():
-                    print("→ Auto-advance")
-                    self.next_track()
+            self.watchdog.heartbeat('monitor')
+            
+            if time.monotonic() - last_export > self.METRICS_INTERVAL:
+                # High priority: metrics matter most when headroom is low
+                self.scheduler.submit(self.export_metrics,
+                                      priority=TaskScheduler.PRIORITY_HIGH,
+                                      name='export_metrics')
+                last_export = time.monotonic()
+            
+            with self.playback_lock:
+                if self.is_playing and not self.is_paused:
+                    if not self.music.get_busy():
+                        print("→ Auto-advance")
+                        self.watchdog.begin('track_gap')
+                        self.next_track(auto_advance=True)
+                        last_position = None
+                    else:
+                        # Busy but not moving means the mixer has silently stopped
+                        position = self.music.get_pos()
+                        self.watchdog.playback_stalled(position == last_position)
+                        last_position = position
+                        
+                        if self.chapters:
+                            self.follow_chapters()
+                else:
+                    self.watchdog.playback_stalled(False)
+                    last_position = None
             time.sleep(0.5)
     
+    def follow_chapters(self):
+        """Keep chapter index and display in step with playback"""
+        position = self.get_position()
+        index = self.current_chapter_index
+        while (index + 1 < len(self.chapters) and
+               position >= self.chapters[index + 1]['start']):
+            index += 1
+        
+        if index != self.current_chapter_index:
+            self.current_chapter_index = index
+            print(f"→ Chapter {index + 1}/{len(self.chapters)}: {self.chapters[index]['title']}")
+            
+            story_name = self.current_folder.name.replace('_', ' ')
+            if len(story_name) > 3 and story_name[:2].isdigit():
+                story_name = story_name[3:]
+            self.update_display(story_name[:16], self.track_display_name())
+            self.request_save()
+    
     # Button handlers
     def button_play(self):
         """Play/Pause pressed"""
@@ -805,6 +3163,7 @@ class StoryBox:
         
         try:
             while True:
+                self.watchdog.heartbeat('main')
                 time.sleep(1)
         except KeyboardInterrupt:
             print("\nShutting down...")
@@ -816,6 +3175,8 @@ class StoryBox:
         self.play_sound('goodbye')
         time.sleep(0.5)
         
+        self.scheduler.shutdown()
+        self.watchdog.stop()
         self.save_state()
         self.stop_event.set()
         time.sleep(0.5)
@@ -826,6 +3187,8 @@ class StoryBox:
             self.lcd.write_string("Goodbye!")
         
         GPIO.output(self.PIN_LED, GPIO.HIGH)
+        if self.stretch_player:
+            self.stretch_player.stop()
         pygame.mixer.quit()
         GPIO.cleanup()
         print("Story Box stopped")